@@ -0,0 +1,73 @@
+"""Measure peak memory of string vs. streaming rendering on synthetic recipes
+
+Each process section of Recipes/Crisp_Roti.json is repeated until it holds
+--steps steps, and the quality options and flour types are repeated to the
+same count. Run from the repository root:
+
+    python benchmarks/bench_memory.py --steps 100 1000 5000
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_html_files import STEP_SECTIONS, load_template, render_recipe, write_recipe_html
+
+def synthetic_recipe(base, count):
+    """Return a copy of base with count steps per section, quality options and flour types"""
+    data = copy.deepcopy(base)
+    quality = data['qualityControl']['quality']
+    options = list(quality.values())
+    data['qualityControl']['quality'] = {f'option{i}': options[i % len(options)] for i in range(1, count + 1)}
+
+    weight = data['settings']['thickness']['dispensing']['weight']
+    ratios = list(weight['ratioWaterFlour'].values())
+    weight['ratioWaterFlour'] = {f'Flour {i}': ratios[i % len(ratios)] for i in range(count)}
+
+    thickness = data['settings']['thickness']
+    for step_name in STEP_SECTIONS:
+        steps = list(thickness[step_name].values())
+        thickness[step_name] = {f'step{i}': steps[i % len(steps)] for i in range(count)}
+    return data
+
+def peak_bytes(func):
+    """Return peak traced allocation in bytes while func runs"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--steps', type=int, nargs='+', default=[10, 100, 1000, 5000],
+                        help='steps per section to synthesise')
+    args = parser.parse_args()
+
+    with open('Recipes/Crisp_Roti.json', 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    template = load_template()
+
+    print(f"{'steps':>8} {'output KB':>10} {'string peak KB':>15} {'stream peak KB':>15}")
+    for count in args.steps:
+        data = synthetic_recipe(base, count)
+        with open(os.devnull, 'w', encoding='utf-8') as devnull:
+            def render_string():
+                devnull.write(render_recipe(data, template))
+
+            def render_stream():
+                write_recipe_html(data, devnull, template)
+
+            string_peak = peak_bytes(render_string)
+            stream_peak = peak_bytes(render_stream)
+        size = len(render_recipe(data, template).encode('utf-8'))
+        print(f"{count:>8} {size / 1024:>10.0f} {string_peak / 1024:>15.0f} {stream_peak / 1024:>15.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Repeatable render benchmark over synthetic recipe corpora
+
+Each corpus cycles through the shapes of the shipped Recipes/*.json, giving
+every recipe its own id, name and version. Recipes are written one at a time
+to a small set of scratch files and rendered with generate_html_from_json, so
+every timed call parses, validates, renders and writes a real file. Each
+corpus runs in a fresh process, so its peak RSS is its own.
+
+Results are printed as JSON: throughput, per-recipe latency percentiles and
+peak RSS for each corpus size. Run from the repository root:
+
+    python benchmarks/bench_suite.py                          # 10, 1000 and 100000 recipes
+    python benchmarks/bench_suite.py --sizes 10 1000 --stages -o bench.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_html_files import LOGO_PATH, RECIPES_DIR, generate_html_from_json, load_template
+from render_profile import RenderProfile
+from validate_recipes import recipe_validator
+
+# Scratch input and output files reused round-robin, bounding disk use
+SCRATCH_SLOTS = 64
+
+IDENTITY_KEYS = ('recipeId', 'recipeName', 'recipeVersion')
+
+def load_shapes(recipes_dir=RECIPES_DIR):
+    """Return (name, JSON text without the identity keys) for every shipped recipe"""
+    shapes = []
+    for json_path in sorted(Path(recipes_dir).glob('*.json')):
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        rest = {key: value for key, value in data.items() if key not in IDENTITY_KEYS}
+        shapes.append((data['recipeName'], json.dumps(rest, indent=4)[1:]))
+    return shapes
+
+def synthetic_recipe_text(shapes, i):
+    """Return the JSON text of the i-th recipe of a corpus"""
+    name, rest = shapes[i % len(shapes)]
+    header = json.dumps({'recipeId': 100000 + i, 'recipeName': f'{name} #{i}', 'recipeVersion': f'1.0.{i}'},
+                        indent=4)[:-2]
+    return f'{header},{rest}'
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KB, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def run_corpus(size, stages=False):
+    """Render a synthetic corpus of size recipes and return its measurements"""
+    shapes = load_shapes()
+    profile = RenderProfile() if stages else None
+    start = time.perf_counter_ns()
+    load_template()
+    template_ms = (time.perf_counter_ns() - start) / 1e6
+    # The validator is compiled on first use; keep that out of the timed renders
+    start = time.perf_counter_ns()
+    recipe_validator()
+    validator_ms = (time.perf_counter_ns() - start) / 1e6
+
+    latencies = []
+    output_bytes = 0
+    with tempfile.TemporaryDirectory() as scratch, open(os.devnull, 'w') as devnull:
+        scratch = Path(scratch)
+        started = time.perf_counter()
+        for i in range(size):
+            slot = i % SCRATCH_SLOTS
+            json_path = scratch / f'recipe_{slot}.json'
+            html_path = scratch / f'recipe_{slot}.html'
+            json_path.write_text(synthetic_recipe_text(shapes, i), encoding='utf-8')
+            with contextlib.redirect_stdout(devnull):
+                t0 = time.perf_counter_ns()
+                generate_html_from_json(json_path, html_path, LOGO_PATH, profile)
+                latencies.append(time.perf_counter_ns() - t0)
+            output_bytes += html_path.stat().st_size
+        wall_seconds = time.perf_counter() - started
+
+    render_seconds = sum(latencies) / 1e9
+    latencies.sort()
+    result = {
+        'recipes': size,
+        'template_compile_ms': template_ms,
+        'validator_compile_ms': validator_ms,
+        'render_seconds': render_seconds,
+        'wall_seconds': wall_seconds,
+        'recipes_per_second': size / render_seconds if render_seconds else None,
+        'output_mb_per_second': output_bytes / 1e6 / render_seconds if render_seconds else None,
+        'latency_ms': {
+            'mean': statistics.fmean(latencies) / 1e6,
+            'p50': percentile(latencies, 50) / 1e6,
+            'p90': percentile(latencies, 90) / 1e6,
+            'p99': percentile(latencies, 99) / 1e6,
+            'max': latencies[-1] / 1e6,
+        },
+        'peak_rss_kb': peak_rss_kb(),
+    }
+    if profile is not None:
+        result['stages'] = profile.as_dict()['stages']
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000],
+                        help='recipes per synthetic corpus')
+    parser.add_argument('--stages', action='store_true', help='include per-stage timings from RenderProfile')
+    parser.add_argument('-o', '--output', help='write the JSON report to a file instead of stdout')
+    args = parser.parse_args()
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'shapes': len(load_shapes()),
+        'corpora': [],
+    }
+    # A fresh spawned process per corpus keeps peak RSS and template caches independent
+    context = multiprocessing.get_context('spawn')
+    for size in args.sizes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_corpus, size, args.stages).result()
+        report['corpora'].append(result)
+        print(f"{size} recipes: {result['recipes_per_second']:.0f}/s, "
+              f"p50 {result['latency_ms']['p50']:.2f} ms, p99 {result['latency_ms']['p99']:.2f} ms",
+              file=sys.stderr)
+
+    text = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""Rebuild recipe JSON from saved HTML recipe forms
+
+Reads the field ids written by generate_html_files.py ({step}_{n}_vtSpeed,
+flour{i}_values, quality{i}_softness, dispensingOil, ...) with a single-pass
+streaming regex tokenizer instead of building a DOM. Values are parsed the
+same way as parseArrayInput in the form's JavaScript.
+
+    python extract_recipe_json.py "HTML Files/jowar_bhakri.html" -o extracted/
+    python extract_recipe_json.py --verify
+"""
+import argparse
+import copy
+import html
+import io
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from generate_html_files import FORM_FIELDS, RECIPES_DIR, STEP_FIELDS, STEP_SECTIONS, get_path, render_recipe
+from validate_recipes import RecipeValidationError, check_recipe
+
+# Step fields holding plain strings rather than comma-separated numbers
+STEP_TEXT_FIELDS = {'module', 'command'}
+
+QUALITY_ID_RE = re.compile(r'quality(\d+)_(softness|roastStep|roastMaxStep|note)$')
+FLOUR_ID_RE = re.compile(r'flour(\d+)_(name|values)$')
+STEP_ID_RE = re.compile(r'(%s)_(\d+)_(%s)$' % (
+    '|'.join(STEP_SECTIONS),
+    '|'.join(key for key, label in STEP_FIELDS),
+))
+
+TOKEN_RE = re.compile(
+    r'<input\b([^>]*)>|<textarea\b([^>]*)>(.*?)</textarea>|<script\b',
+    re.DOTALL | re.IGNORECASE,
+)
+ATTR_RE = re.compile(r'([\w-]+)="([^"]*)"')
+
+CHUNK_SIZE = 64 * 1024
+
+def iter_form_fields(f):
+    """Yield (id, value) for each input and textarea, reading f in chunks
+
+    Only <input>, <textarea> and <script> are tokenized; scanning stops at the
+    first <script>, since every form field precedes it.
+    """
+    carry = ''
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        buffer = carry + chunk
+        last_end = 0
+        for match in TOKEN_RE.finditer(buffer):
+            input_attrs, textarea_attrs, textarea_text = match.groups()
+            if input_attrs is None and textarea_attrs is None:
+                return
+            attrs = dict(ATTR_RE.findall(input_attrs if input_attrs is not None else textarea_attrs))
+            if 'id' in attrs:
+                value = attrs.get('value', '') if input_attrs is not None else textarea_text
+                yield attrs['id'], html.unescape(value)
+            last_end = match.end()
+        if not chunk:
+            return
+        # Keep any tag that may be cut off at the chunk boundary for the next pass
+        start = buffer.rfind('<textarea', last_end)
+        if start == -1:
+            start = buffer.rfind('<', last_end)
+        carry = buffer[start:] if start != -1 else ''
+
+def parse_number(value, default=0):
+    """Parse an int or float from form text, falling back to default"""
+    value = value.strip()
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+def parse_array(value):
+    """Parse comma-separated numbers the way parseArrayInput does in the form"""
+    if not value:
+        return []
+    return [parse_number(v) for v in value.split(',')]
+
+def set_path(data, path, value):
+    """Set a nested key path, creating intermediate dicts"""
+    for key in path[:-1]:
+        data = data.setdefault(key, {})
+    data[path[-1]] = value
+
+def recipe_from_fields(fields):
+    """Rebuild recipe JSON from form fields keyed by element id"""
+    quality = {}
+    flours = {}
+    steps = {name: {} for name in STEP_SECTIONS}
+    for field_id, value in fields.items():
+        match = STEP_ID_RE.match(field_id)
+        if match:
+            step_name, step_num, key = match.groups()
+            step = steps[step_name].setdefault(int(step_num), {})
+            step[key] = value if key in STEP_TEXT_FIELDS else parse_array(value)
+            continue
+        match = QUALITY_ID_RE.match(field_id)
+        if match:
+            quality.setdefault(int(match.group(1)), {})[match.group(2)] = value
+            continue
+        match = FLOUR_ID_RE.match(field_id)
+        if match:
+            flours.setdefault(int(match.group(1)), {})[match.group(2)] = value
+
+    data = {
+        'recipeId': parse_number(fields.get('recipeId', '')),
+        'recipeName': fields.get('recipeName', ''),
+        'recipeVersion': fields.get('recipeVersion', ''),
+        'description': fields.get('description', ''),
+        'qualityControl': {'quality': {}},
+    }
+    for i in sorted(quality):
+        option = quality[i]
+        data['qualityControl']['quality'][f'option{i}'] = {
+            'softness': parse_number(option.get('softness', ''), 0),
+            'roastStep': parse_number(option.get('roastStep', ''), 1),
+            'roastMaxStep': parse_number(option.get('roastMaxStep', ''), 2),
+            'note': option.get('note', ''),
+        }
+
+    for field_id, (path, default) in FORM_FIELDS.items():
+        value = fields.get(field_id, '')
+        if isinstance(default, list):
+            set_path(data, path, parse_array(value))
+        else:
+            set_path(data, path, parse_number(value, default))
+
+    ratio_water_flour = {}
+    for i in sorted(flours):
+        name = flours[i].get('name', '').strip()
+        if name:
+            ratio_water_flour[name] = parse_array(flours[i].get('values', ''))
+    set_path(data, ('settings', 'thickness', 'dispensing', 'weight', 'ratioWaterFlour'), ratio_water_flour)
+
+    thickness = data['settings']['thickness']
+    for step_name in STEP_SECTIONS:
+        thickness[step_name] = {f'step{n}': steps[step_name][n] for n in sorted(steps[step_name])}
+        if step_name == 'tractionlosscorrection':
+            # The dropping section has no fields but is part of every recipe
+            thickness['dropping'] = {}
+    return data
+
+def extract_recipe(html_path):
+    """Rebuild recipe JSON from a saved HTML form file"""
+    with open(html_path, 'r', encoding='utf-8') as f:
+        return recipe_from_fields(dict(iter_form_fields(f)))
+
+def extract_recipe_from_string(text):
+    """Rebuild recipe JSON from HTML form text"""
+    return recipe_from_fields(dict(iter_form_fields(io.StringIO(text))))
+
+def _extract_one(paths):
+    """Process pool worker: extract one form to JSON
+
+    Returns (json_path, validation errors or None). A form the generator did
+    not write yields a recipe that fails validation; it is not written.
+    """
+    html_path, json_path = paths
+    data = extract_recipe(html_path)
+    try:
+        check_recipe(data, str(html_path))
+    except RecipeValidationError as e:
+        json_path.unlink(missing_ok=True)
+        return json_path, e.errors
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4)
+    return json_path, None
+
+def extract_all(html_paths, output_dir, jobs=None):
+    """Extract many HTML forms to output_dir/<stem>.json in parallel; return [(json_path, errors or None)]"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    todo = [(Path(p), output_dir / f'{Path(p).stem}.json') for p in html_paths]
+    if len(todo) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(todo) // ((jobs or 4) * 4))
+            return list(pool.map(_extract_one, todo, chunksize=chunksize))
+    return [_extract_one(paths) for paths in todo]
+
+def diff_paths(a, b, path=()):
+    """Yield key paths where two JSON values differ"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in a.keys() | b.keys():
+            if key not in a or key not in b:
+                yield path + (key,)
+            else:
+                yield from diff_paths(a[key], b[key], path + (key,))
+    elif a != b or type(a) is not type(b):
+        yield path
+
+# Markup characters the generator must escape for the text to survive a round trip
+ESCAPE_TEXT = 'a "b" &amp; c & <d> </textarea>'
+
+def with_markup_text(data):
+    """Return a copy of data with markup characters in every free-text field"""
+    data = copy.deepcopy(data)
+    data['recipeName'] += f' {ESCAPE_TEXT}'
+    data['recipeVersion'] += '&"<'
+    data['description'] = ESCAPE_TEXT
+    for option in get_path(data, ('qualityControl', 'quality'), {}).values():
+        option['note'] = ESCAPE_TEXT
+    weight = get_path(data, ('settings', 'thickness', 'dispensing', 'weight'), {})
+    if 'ratioWaterFlour' in weight:
+        weight['ratioWaterFlour'] = {f'{name} "&<': values for name, values in weight['ratioWaterFlour'].items()}
+    return data
+
+def verify_round_trip(recipes_dir=RECIPES_DIR):
+    """Check JSON -> HTML -> JSON is lossless for every recipe; return the failures
+
+    Each recipe is also checked with markup characters in its text fields.
+    """
+    failures = {}
+    for json_path in sorted(Path(recipes_dir).glob('*.json')):
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for label, recipe in ((str(json_path), data), (f'{json_path} (markup text)', with_markup_text(data))):
+            differences = list(diff_paths(recipe, extract_recipe_from_string(render_recipe(recipe))))
+            if differences:
+                failures[label] = differences
+                print(f"FAIL {label}")
+                for path in differences:
+                    print(f"    {'.'.join(path)}")
+            else:
+                print(f"OK   {label}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild recipe JSON from saved HTML recipe forms')
+    parser.add_argument('html_files', nargs='*', help='HTML forms to extract')
+    parser.add_argument('-o', '--output-dir', default='.', help='directory for extracted JSON files')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--verify', action='store_true',
+                        help='check every Recipes/*.json round-trips through HTML losslessly')
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(1 if verify_round_trip() else 0)
+    if not args.html_files:
+        parser.error('no HTML files given')
+    results = extract_all(args.html_files, args.output_dir, args.jobs)
+    for json_path, errors in results:
+        if errors:
+            print(f"Invalid: {json_path}")
+            for error in errors:
+                print(f"    {error}")
+        else:
+            print(f"Extracted: {json_path}")
+    sys.exit(1 if any(errors for json_path, errors in results) else 0)
+
+if __name__ == '__main__':
+    main()
@@ -1,308 +1,673 @@
+import argparse
+import cProfile
+import functools
+import hashlib
+import html
 import json
 import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from render_profile import NULL_PROFILE, RenderProfile
+from validate_recipes import RecipeValidationError, check_recipe
+
+RECIPES_DIR = Path('Recipes')
+HTML_DIR = Path('HTML Files')
+TEMPLATE_PATH = HTML_DIR / 'crisp_roti.html'
+LOGO_PATH = Path('logo.jpg')
+MANIFEST_PATH = Path('.build-manifest.json')
+SITE_DIR = Path('site')
+
+# Static files copied as-is into a --split site
+SITE_FILES = ['index.html', 'rotimatic-recipe-builder.html', 'logo.jpg']
+
+# Process step sections in the order they appear in the form
+STEP_SECTIONS = [
+    'mixing',
+    'doughing',
+    'stabilizing',
+    'rounding',
+    'tractionlosscorrection',
+    'transferring',
+    'pressing',
+    'roasting',
+    'kicking',
+]
+
+# Form field id -> (path into the recipe JSON, fallback when the path is missing)
+FORM_FIELDS = {
+    'sizeOption1': (('qualityControl', 'size', 'option1'), 0.1),
+    'sizeOption2': (('qualityControl', 'size', 'option2'), -0.1),
+    'sizeUpLimit': (('qualityControl', 'size', 'upLimit'), 0.4),
+    'sizeDownLimit': (('qualityControl', 'size', 'downLimit'), -0.4),
+    'softnessOption1': (('qualityControl', 'softness', 'option1'), -0.08),
+    'softnessOption2': (('qualityControl', 'softness', 'option2'), -0.04),
+    'softnessOption3': (('qualityControl', 'softness', 'option3'), -0.01),
+    'softnessOption4': (('qualityControl', 'softness', 'option4'), 0.07),
+    'softnessOption5': (('qualityControl', 'softness', 'option5'), 0.02),
+    'softnessUpLimit': (('qualityControl', 'softness', 'upLimit'), 0.08),
+    'softnessDownLimit': (('qualityControl', 'softness', 'downLimit'), -0.08),
+    'roastStep': (('settings', 'roastLevel', 'step'), 9),
+    'roastDuration': (('settings', 'roastLevel', 'duration'), []),
+    'topRoastTemp': (('settings', 'roastLevel', 'topRoastTemp'), []),
+    'btmRoastTemp': (('settings', 'roastLevel', 'btmRoastTemp'), []),
+    'oilLevel': (('settings', 'oilLevel'), []),
+    'heatingTopTemp': (('settings', 'thickness', 'heating', 'temperature', 'top'), []),
+    'heatingBottomTemp': (('settings', 'thickness', 'heating', 'temperature', 'bottom'), []),
+    'heatingTopRoastTemp': (('settings', 'thickness', 'heating', 'temperature', 'topRoast'), []),
+    'heatingBottomRoastTemp': (('settings', 'thickness', 'heating', 'temperature', 'bottomRoast'), []),
+    'heatingTopTolerance': (('settings', 'thickness', 'heating', 'tolerance', 'top'), []),
+    'heatingBottomTolerance': (('settings', 'thickness', 'heating', 'tolerance', 'bottom'), []),
+    'heatingTopRoastTolerance': (('settings', 'thickness', 'heating', 'tolerance', 'topRoast'), []),
+    'heatingBottomRoastTolerance': (('settings', 'thickness', 'heating', 'tolerance', 'bottomRoast'), []),
+    'warmTopTolerance': (('settings', 'thickness', 'heating', 'warmTolerance', 'top'), []),
+    'warmBottomTolerance': (('settings', 'thickness', 'heating', 'warmTolerance', 'bottom'), []),
+    'warmTopRoastTolerance': (('settings', 'thickness', 'heating', 'warmTolerance', 'topRoast'), []),
+    'warmBottomRoastTolerance': (('settings', 'thickness', 'heating', 'warmTolerance', 'bottomRoast'), []),
+    'dispensingDB': (('settings', 'thickness', 'dispensing', 'weight', 'db'), []),
+    'dispensingOil': (('settings', 'thickness', 'dispensing', 'weight', 'oil'), []),
+    'dispensingToleranceFlour': (('settings', 'thickness', 'dispensing', 'tolerance', 'flour'), []),
+    'dispensingToleranceWater': (('settings', 'thickness', 'dispensing', 'tolerance', 'water'), []),
+    'dispensingToleranceOil': (('settings', 'thickness', 'dispensing', 'tolerance', 'oil'), []),
+    'dispensingToleranceRatioWaterFlour': (('settings', 'thickness', 'dispensing', 'tolerance', 'ratioWaterFlour'), []),
+    'adaptiveDAKHardness': (('settings', 'thickness', 'adaptiveDAK', 'hardness'), []),
+    'adaptiveDAKTolerance': (('settings', 'thickness', 'adaptiveDAK', 'tolerance'), []),
+    'adaptiveDAKSlurryRange': (('settings', 'thickness', 'adaptiveDAK', 'slurryRange'), []),
+}
+
+# Step JSON key -> form label, in the order the fields appear in a step block
+STEP_FIELDS = [
+    ('module', 'Module'),
+    ('command', 'Command'),
+    ('vtPosition', 'VT Position (comma-separated)'),
+    ('vtSpeed', 'VT Speed (comma-separated)'),
+    ('knSpeed', 'KN Speed (comma-separated)'),
+    ('knDuration', 'KN Duration (comma-separated)'),
+    ('position', 'Position (comma-separated)'),
+    ('speed', 'Speed (comma-separated)'),
+    ('duration', 'Duration (comma-separated)'),
+    ('current', 'Current (comma-separated)'),
+    ('tolerance', 'Tolerance (comma-separated)'),
+    ('holdTime', 'Hold Time (comma-separated)'),
+    ('upPosition', 'Up Position (comma-separated)'),
+    ('upSpeed', 'Up Speed (comma-separated)'),
+]
+
+# Precomputed markup around each step field's id and value
+_STEP_FIELD_MARKUP = [
+    (key, f'<div class="form-group"><label>{label}</label><input type="text" id="', f'_{key}" value="')
+    for key, label in STEP_FIELDS
+]
+
+# Container divs that receive generated markup
+CONTAINER_SLOTS = ['qualityOptions', 'flourRatios'] + [f'{name}Steps' for name in STEP_SECTIONS]
+
+_template_cache = {}
+
 def format_array(arr):
     """Format array as comma-separated string"""
     if isinstance(arr, list):
         return ','.join(str(x) for x in arr)
     return str(arr)
 
-def generate_html_from_json(json_path, html_path, logo_path):
-    """Generate HTML file from JSON recipe data"""
-    
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    recipe_name = data['recipeName']
-    recipe_id = data['recipeId']
-    recipe_version = data['recipeVersion']
-    description = data.get('description', '')
-    
-    # Get quality control data
-    quality_control = data.get('qualityControl', {})
-    quality = quality_control.get('quality', {})
-    size = quality_control.get('size', {})
-    softness = quality_control.get('softness', {})
-    
-    # Get settings
-    settings = data.get('settings', {})
-    roast_level = settings.get('roastLevel', {})
-    oil_level = settings.get('oilLevel', [])
-    thickness = settings.get('thickness', {})
-    heating = thickness.get('heating', {})
-    dispensing = thickness.get('dispensing', {})
-    adaptive_dak = thickness.get('adaptiveDAK', {})
-    
-    # Get process steps
-    mixing = thickness.get('mixing', {})
-    doughing = thickness.get('doughing', {})
-    stabilizing = thickness.get('stabilizing', {})
-    rounding = thickness.get('rounding', {})
-    tractionlosscorrection = thickness.get('tractionlosscorrection', {})
-    transferring = thickness.get('transferring', {})
-    pressing = thickness.get('pressing', {})
-    roasting = thickness.get('roasting', {})
-    kicking = thickness.get('kicking', {})
-    
-    # Generate quality options HTML
-    quality_options_html = ''
+# Characters html.escape(quote=True) replaces; most values are plain numbers
+_MARKUP_CHARS = re.compile(r'[&<>"\']')
+
+def escape_value(value):
+    """Format a value for an attribute or textarea, escaped so the extractor reads it back unchanged"""
+    text = format_array(value)
+    return html.escape(text, quote=True) if _MARKUP_CHARS.search(text) else text
+
+def get_path(data, path, default=None):
+    """Look up a nested key path, returning default if any key is missing"""
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return default
+        data = data[key]
+    return data
+
+class CompiledTemplate:
+    """Template split once into static chunks and the named slots between them"""
+
+    def __init__(self, chunks, slots):
+        self.chunks = chunks
+        self.slots = slots
+
+    def iter_render(self, values):
+        """Yield template fragments; slot values may be strings or iterables of strings"""
+        yield self.chunks[0]
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            value = values[slot]
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+            yield chunk
+
+    def render(self, values):
+        """Render the template in a single pass with values keyed by slot id"""
+        return ''.join(self.iter_render(values))
+
+def _find_slot(text, pattern, slot):
+    """Return the span of the single match of pattern's first group"""
+    matches = list(re.finditer(pattern, text, re.DOTALL))
+    if len(matches) != 1:
+        raise ValueError(f"Template slot '{slot}' matched {len(matches)} times")
+    return matches[0].span(1)
+
+def compile_template(template):
+    """Parse template HTML into a CompiledTemplate keyed by the form field ids"""
+    # Drop the JavaScript default initialization since pages are pre-populated
+    init_start = template.find("// Initialize form with default values")
+    if init_start != -1:
+        init_end = template.find("};", init_start) + 2
+        template = template[:init_start] + "// Form already initialized with recipe data\n" + template[init_end:]
+
+    patterns = {
+        'title': r'<title>(.*?) Recipe</title>',
+        'description': r'<textarea id="description"[^>]*>(.*?)</textarea>',
+        'qualityOptionCount': r'let qualityOptionCount = (\d+);',
+        'flourRatioCount': r'let flourRatioCount = (\d+);',
+    }
+    for field_id in ['recipeId', 'recipeName', 'recipeVersion'] + list(FORM_FIELDS):
+        patterns[field_id] = rf'\bid="{field_id}"[^>]*?\bvalue="([^"]*)"'
+    for container_id in CONTAINER_SLOTS:
+        patterns[container_id] = rf'<div id="{container_id}">()</div>'
+
+    spans = sorted((_find_slot(template, pattern, slot), slot) for slot, pattern in patterns.items())
+    chunks = []
+    slots = []
+    pos = 0
+    for (start, end), slot in spans:
+        chunks.append(template[pos:start])
+        slots.append(slot)
+        pos = end
+    chunks.append(template[pos:])
+    return CompiledTemplate(chunks, slots)
+
+def load_template(template_path=TEMPLATE_PATH):
+    """Return the compiled template, recompiling only when the file changes"""
+    template_path = Path(template_path)
+    mtime = template_path.stat().st_mtime_ns
+    cached = _template_cache.get(template_path)
+    if cached is None or cached[0] != mtime:
+        with open(template_path, 'r', encoding='utf-8') as f:
+            cached = (mtime, compile_template(f.read()))
+        _template_cache[template_path] = cached
+    return cached[1]
+
+def iter_quality_options_html(quality):
+    """Yield one quality option block at a time"""
     for i, (key, val) in enumerate(quality.items(), 1):
-        quality_options_html += f'''
+        yield f'''
             <div class="nested-section">
                 <h4>Quality Option {i}</h4>
                 <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px;">
                     <div class="form-group">
                         <label>Softness</label>
-                        <input type="number" step="0.01" id="quality{i}_softness" value="{val.get('softness', 0)}">
+                        <input type="number" step="0.01" id="quality{i}_softness" value="{escape_value(val.get('softness', 0))}">
                     </div>
                     <div class="form-group">
                         <label>Roast Step</label>
-                        <input type="number" id="quality{i}_roastStep" value="{val.get('roastStep', 1)}">
+                        <input type="number" id="quality{i}_roastStep" value="{escape_value(val.get('roastStep', 1))}">
                     </div>
                     <div class="form-group">
                         <label>Roast Max Step</label>
-                        <input type="number" id="quality{i}_roastMaxStep" value="{val.get('roastMaxStep', 2)}">
+                        <input type="number" id="quality{i}_roastMaxStep" value="{escape_value(val.get('roastMaxStep', 2))}">
                     </div>
                     <div class="form-group">
                         <label>Note</label>
-                        <input type="text" id="quality{i}_note" value="{val.get('note', '')}">
+                        <input type="text" id="quality{i}_note" value="{escape_value(val.get('note', ''))}">
                     </div>
                 </div>
             </div>'''
-    
-    # Generate flour ratios HTML
-    flour_ratios_html = ''
-    ratio_water_flour = dispensing.get('weight', {}).get('ratioWaterFlour', {})
+
+def iter_flour_ratios_html(ratio_water_flour):
+    """Yield one flour type ratio row at a time"""
     for i, (name, values) in enumerate(ratio_water_flour.items()):
-        flour_ratios_html += f'''
+        yield f'''
             <div class="nested-section" id="flourRatio{i}">
                 <div style="display: grid; grid-template-columns: 1fr 2fr auto; gap: 15px; align-items: end;">
                     <div class="form-group">
                         <label>Flour Name</label>
-                        <input type="text" id="flour{i}_name" value="{name}" placeholder="e.g., Default">
+                        <input type="text" id="flour{i}_name" value="{escape_value(name)}" placeholder="e.g., Default">
                     </div>
                     <div class="form-group">
                         <label>Ratios (comma-separated)</label>
-                        <input type="text" id="flour{i}_values" value="{format_array(values)}" placeholder="0.69,0.69,0.69">
+                        <input type="text" id="flour{i}_values" value="{escape_value(values)}" placeholder="0.69,0.69,0.69">
                     </div>
                     <button type="button" onclick="removeFlourRatio({i})" style="padding: 10px 15px; background: #e74c3c; color: white; border: none; border-radius: 5px; cursor: pointer; height: fit-content;">Remove</button>
                 </div>
             </div>'''
-    
-    # Generate step HTML
-    def generate_step_html(step_name, step_num, step_data):
-        html = f'<div class="nested-section" id="{step_name}Step{step_num}"><h4>Step {step_num}</h4><div style="display: grid; grid-template-columns: repeat(5, minmax(0, 1fr)); gap: 20px; align-items: start;">'
-        
-        if 'module' in step_data:
-            html += f'<div class="form-group"><label>Module</label><input type="text" id="{step_name}_{step_num}_module" value="{step_data["module"]}"></div>'
-        if 'command' in step_data:
-            html += f'<div class="form-group"><label>Command</label><input type="text" id="{step_name}_{step_num}_command" value="{step_data["command"]}"></div>'
-        if 'vtPosition' in step_data:
-            html += f'<div class="form-group"><label>VT Position (comma-separated)</label><input type="text" id="{step_name}_{step_num}_vtPosition" value="{format_array(step_data["vtPosition"])}"></div>'
-        if 'vtSpeed' in step_data:
-            html += f'<div class="form-group"><label>VT Speed (comma-separated)</label><input type="text" id="{step_name}_{step_num}_vtSpeed" value="{format_array(step_data["vtSpeed"])}"></div>'
-        if 'knSpeed' in step_data:
-            html += f'<div class="form-group"><label>KN Speed (comma-separated)</label><input type="text" id="{step_name}_{step_num}_knSpeed" value="{format_array(step_data["knSpeed"])}"></div>'
-        if 'knDuration' in step_data:
-            html += f'<div class="form-group"><label>KN Duration (comma-separated)</label><input type="text" id="{step_name}_{step_num}_knDuration" value="{format_array(step_data["knDuration"])}"></div>'
-        if 'position' in step_data:
-            html += f'<div class="form-group"><label>Position (comma-separated)</label><input type="text" id="{step_name}_{step_num}_position" value="{format_array(step_data["position"])}"></div>'
-        if 'speed' in step_data:
-            html += f'<div class="form-group"><label>Speed (comma-separated)</label><input type="text" id="{step_name}_{step_num}_speed" value="{format_array(step_data["speed"])}"></div>'
-        if 'duration' in step_data:
-            html += f'<div class="form-group"><label>Duration (comma-separated)</label><input type="text" id="{step_name}_{step_num}_duration" value="{format_array(step_data["duration"])}"></div>'
-        if 'current' in step_data:
-            html += f'<div class="form-group"><label>Current (comma-separated)</label><input type="text" id="{step_name}_{step_num}_current" value="{format_array(step_data["current"])}"></div>'
-        if 'tolerance' in step_data:
-            html += f'<div class="form-group"><label>Tolerance (comma-separated)</label><input type="text" id="{step_name}_{step_num}_tolerance" value="{format_array(step_data["tolerance"])}"></div>'
-        if 'holdTime' in step_data:
-            html += f'<div class="form-group"><label>Hold Time (comma-separated)</label><input type="text" id="{step_name}_{step_num}_holdTime" value="{format_array(step_data["holdTime"])}"></div>'
-        if 'upPosition' in step_data:
-            html += f'<div class="form-group"><label>Up Position (comma-separated)</label><input type="text" id="{step_name}_{step_num}_upPosition" value="{format_array(step_data["upPosition"])}"></div>'
-        if 'upSpeed' in step_data:
-            html += f'<div class="form-group"><label>Up Speed (comma-separated)</label><input type="text" id="{step_name}_{step_num}_upSpeed" value="{format_array(step_data["upSpeed"])}"></div>'
-        
-        html += '</div></div>'
-        return html
-    
-    # Generate mixing steps
-    mixing_html = ''
-    for key in sorted(mixing.keys()):
-        step_num = key.replace('step', '')
-        mixing_html += generate_step_html('mixing', step_num, mixing[key])
-    
-    # Generate doughing steps
-    doughing_html = ''
-    for key in sorted(doughing.keys()):
-        step_num = key.replace('step', '')
-        doughing_html += generate_step_html('doughing', step_num, doughing[key])
-    
-    # Generate stabilizing steps
-    stabilizing_html = ''
-    for key in sorted(stabilizing.keys()):
-        step_num = key.replace('step', '')
-        stabilizing_html += generate_step_html('stabilizing', step_num, stabilizing[key])
-    
-    # Generate rounding steps
-    rounding_html = ''
-    for key in sorted(rounding.keys()):
-        step_num = key.replace('step', '')
-        rounding_html += generate_step_html('rounding', step_num, rounding[key])
-    
-    # Generate tractionlosscorrection steps
-    traction_html = ''
-    for key in sorted(tractionlosscorrection.keys()):
-        step_num = key.replace('step', '')
-        traction_html += generate_step_html('tractionlosscorrection', step_num, tractionlosscorrection[key])
-    
-    # Generate transferring steps
-    transferring_html = ''
-    for key in sorted(transferring.keys()):
-        step_num = key.replace('step', '')
-        transferring_html += generate_step_html('transferring', step_num, transferring[key])
-    
-    # Generate pressing steps
-    pressing_html = ''
-    for key in sorted(pressing.keys()):
-        step_num = key.replace('step', '')
-        pressing_html += generate_step_html('pressing', step_num, pressing[key])
-    
-    # Generate roasting steps
-    roasting_html = ''
-    for key in sorted(roasting.keys()):
-        step_num = key.replace('step', '')
-        roasting_html += generate_step_html('roasting', step_num, roasting[key])
-    
-    # Generate kicking steps
-    kicking_html = ''
-    for key in sorted(kicking.keys()):
-        step_num = key.replace('step', '')
-        kicking_html += generate_step_html('kicking', step_num, kicking[key])
-    
-    # Read the template HTML (crisp_roti.html)
-    template_path = Path('HTML Files/crisp_roti.html')
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template = f.read()
-    
-    # Replace values in template
-    html_content = template.replace('Crisp Roti Recipe', f'{recipe_name} Recipe')
-    html_content = html_content.replace('value="1"', f'value="{recipe_id}"', 1)
-    html_content = html_content.replace('value="Classic Roti"', f'value="{recipe_name}"', 1)
-    html_content = html_content.replace('value="1.8.7"', f'value="{recipe_version}"', 1)
-    html_content = html_content.replace('Released: wp  2025 May 24 , 11:48am', description, 1)
-    
-    # Replace quality options
-    quality_start = html_content.find('<div id="qualityOptions"></div>')
-    if quality_start != -1:
-        quality_end = html_content.find('</div>', quality_start) + 6
-        html_content = html_content[:quality_start] + f'<div id="qualityOptions">{quality_options_html}</div>' + html_content[quality_end:]
-    
-    # Replace size values
-    html_content = html_content.replace('id="sizeOption1" value="0.1"', f'id="sizeOption1" value="{size.get("option1", 0.1)}"')
-    html_content = html_content.replace('id="sizeOption2" value="-0.1"', f'id="sizeOption2" value="{size.get("option2", -0.1)}"')
-    html_content = html_content.replace('id="sizeUpLimit" value="0.4"', f'id="sizeUpLimit" value="{size.get("upLimit", 0.4)}"')
-    html_content = html_content.replace('id="sizeDownLimit" value="-0.4"', f'id="sizeDownLimit" value="{size.get("downLimit", -0.4)}"')
-    
-    # Replace softness values
-    html_content = html_content.replace('id="softnessOption1" value="-0.08"', f'id="softnessOption1" value="{softness.get("option1", -0.08)}"')
-    html_content = html_content.replace('id="softnessOption2" value="-0.04"', f'id="softnessOption2" value="{softness.get("option2", -0.04)}"')
-    html_content = html_content.replace('id="softnessOption3" value="-0.01"', f'id="softnessOption3" value="{softness.get("option3", -0.01)}"')
-    html_content = html_content.replace('id="softnessOption4" value="0.07"', f'id="softnessOption4" value="{softness.get("option4", 0.07)}"')
-    html_content = html_content.replace('id="softnessOption5" value="0.02"', f'id="softnessOption5" value="{softness.get("option5", 0.02)}"')
-    html_content = html_content.replace('id="softnessUpLimit" value="0.08"', f'id="softnessUpLimit" value="{softness.get("upLimit", 0.08)}"')
-    html_content = html_content.replace('id="softnessDownLimit" value="-0.08"', f'id="softnessDownLimit" value="{softness.get("downLimit", -0.08)}"')
-    
-    # Replace roast level
-    html_content = html_content.replace('id="roastStep" value="9"', f'id="roastStep" value="{roast_level.get("step", 9)}"')
-    html_content = html_content.replace('id="roastDuration" value="1200,1500,1700,1800,1900"', f'id="roastDuration" value="{format_array(roast_level.get("duration", []))}"')
-    html_content = html_content.replace('id="topRoastTemp" value="0,0,0,0,0"', f'id="topRoastTemp" value="{format_array(roast_level.get("topRoastTemp", []))}"')
-    html_content = html_content.replace('id="btmRoastTemp" value="0,0,0,0,0"', f'id="btmRoastTemp" value="{format_array(roast_level.get("btmRoastTemp", []))}"')
-    
-    # Replace oil level
-    html_content = html_content.replace('id="oilLevel" value="0.01,0.01,0.01"', f'id="oilLevel" value="{format_array(oil_level)}"')
-    
-    # Replace heating temperatures
-    temp = heating.get('temperature', {})
-    html_content = html_content.replace('id="heatingTopTemp" value="125,125,125"', f'id="heatingTopTemp" value="{format_array(temp.get("top", []))}"')
-    html_content = html_content.replace('id="heatingBottomTemp" value="130,130,130"', f'id="heatingBottomTemp" value="{format_array(temp.get("bottom", []))}"')
-    html_content = html_content.replace('id="heatingTopRoastTemp" value="245,245,245"', f'id="heatingTopRoastTemp" value="{format_array(temp.get("topRoast", []))}"')
-    html_content = html_content.replace('id="heatingBottomRoastTemp" value="230,230,230"', f'id="heatingBottomRoastTemp" value="{format_array(temp.get("bottomRoast", []))}"')
-    
-    # Replace heating tolerances
-    tol = heating.get('tolerance', {})
-    html_content = html_content.replace('id="heatingTopTolerance" value="2,2,2"', f'id="heatingTopTolerance" value="{format_array(tol.get("top", []))}"')
-    html_content = html_content.replace('id="heatingBottomTolerance" value="2,2,2"', f'id="heatingBottomTolerance" value="{format_array(tol.get("bottom", []))}"')
-    html_content = html_content.replace('id="heatingTopRoastTolerance" value="5,5,5"', f'id="heatingTopRoastTolerance" value="{format_array(tol.get("topRoast", []))}"')
-    html_content = html_content.replace('id="heatingBottomRoastTolerance" value="5,5,5"', f'id="heatingBottomRoastTolerance" value="{format_array(tol.get("bottomRoast", []))}"')
-    
-    # Replace warm tolerances
-    warm_tol = heating.get('warmTolerance', {})
-    html_content = html_content.replace('id="warmTopTolerance" value="5,5,5"', f'id="warmTopTolerance" value="{format_array(warm_tol.get("top", []))}"')
-    html_content = html_content.replace('id="warmBottomTolerance" value="5,5,5"', f'id="warmBottomTolerance" value="{format_array(warm_tol.get("bottom", []))}"')
-    html_content = html_content.replace('id="warmTopRoastTolerance" value="15,15,15"', f'id="warmTopRoastTolerance" value="{format_array(warm_tol.get("topRoast", []))}"')
-    html_content = html_content.replace('id="warmBottomRoastTolerance" value="15,15,15"', f'id="warmBottomRoastTolerance" value="{format_array(warm_tol.get("bottomRoast", []))}"')
-    
-    # Replace dispensing weights
-    weight = dispensing.get('weight', {})
-    html_content = html_content.replace('id="dispensingDB" value="35,35,35"', f'id="dispensingDB" value="{format_array(weight.get("db", []))}"')
-    html_content = html_content.replace('id="dispensingOil" value="2.6,2.6,3.5"', f'id="dispensingOil" value="{format_array(weight.get("oil", []))}"')
-    
-    # Replace dispensing tolerances
-    disp_tol = dispensing.get('tolerance', {})
-    html_content = html_content.replace('id="dispensingToleranceFlour" value="0.5,0.5,0.5"', f'id="dispensingToleranceFlour" value="{format_array(disp_tol.get("flour", []))}"')
-    html_content = html_content.replace('id="dispensingToleranceWater" value="0.4,0.4,0.4"', f'id="dispensingToleranceWater" value="{format_array(disp_tol.get("water", []))}"')
-    html_content = html_content.replace('id="dispensingToleranceOil" value="0.2,0.2,0.2"', f'id="dispensingToleranceOil" value="{format_array(disp_tol.get("oil", []))}"')
-    html_content = html_content.replace('id="dispensingToleranceRatioWaterFlour" value="0.02,0.02,0.02"', f'id="dispensingToleranceRatioWaterFlour" value="{format_array(disp_tol.get("ratioWaterFlour", []))}"')
-    
-    # Replace flour ratios
-    flour_start = html_content.find('<div id="flourRatios"></div>')
-    if flour_start != -1:
-        flour_end = html_content.find('</div>', flour_start) + 6
-        html_content = html_content[:flour_start] + f'<div id="flourRatios">{flour_ratios_html}</div>' + html_content[flour_end:]
-    
-    # Replace adaptive DAK
-    html_content = html_content.replace('id="adaptiveDAKHardness" value="230,240,370"', f'id="adaptiveDAKHardness" value="{format_array(adaptive_dak.get("hardness", []))}"')
-    html_content = html_content.replace('id="adaptiveDAKTolerance" value="10,10,10"', f'id="adaptiveDAKTolerance" value="{format_array(adaptive_dak.get("tolerance", []))}"')
-    html_content = html_content.replace('id="adaptiveDAKSlurryRange" value="150,150,160"', f'id="adaptiveDAKSlurryRange" value="{format_array(adaptive_dak.get("slurryRange", []))}"')
-    
-    # Replace step sections
-    html_content = html_content.replace('<div id="mixingSteps"></div>', f'<div id="mixingSteps">{mixing_html}</div>')
-    html_content = html_content.replace('<div id="doughingSteps"></div>', f'<div id="doughingSteps">{doughing_html}</div>')
-    html_content = html_content.replace('<div id="stabilizingSteps"></div>', f'<div id="stabilizingSteps">{stabilizing_html}</div>')
-    html_content = html_content.replace('<div id="roundingSteps"></div>', f'<div id="roundingSteps">{rounding_html}</div>')
-    html_content = html_content.replace('<div id="tractionlosscorrectionSteps"></div>', f'<div id="tractionlosscorrectionSteps">{traction_html}</div>')
-    html_content = html_content.replace('<div id="transferringSteps"></div>', f'<div id="transferringSteps">{transferring_html}</div>')
-    html_content = html_content.replace('<div id="pressingSteps"></div>', f'<div id="pressingSteps">{pressing_html}</div>')
-    html_content = html_content.replace('<div id="roastingSteps"></div>', f'<div id="roastingSteps">{roasting_html}</div>')
-    html_content = html_content.replace('<div id="kickingSteps"></div>', f'<div id="kickingSteps">{kicking_html}</div>')
-    
-    # Update quality option count and flour ratio count in JavaScript
-    quality_count = len(quality)
-    flour_count = len(ratio_water_flour)
-    html_content = html_content.replace('let qualityOptionCount = 1;', f'let qualityOptionCount = {quality_count + 1};')
-    html_content = html_content.replace('let flourRatioCount = 0;', f'let flourRatioCount = {flour_count};')
-    
-    # Remove the initialization code that adds default options since we're pre-populating
-    # We'll keep the initialization but make it conditional
-    init_start = html_content.find("// Initialize form with default values")
-    if init_start != -1:
-        init_end = html_content.find("};", init_start) + 2
-        init_code = html_content[init_start:init_end]
-        # Comment out the initialization since we're pre-populating
-        html_content = html_content[:init_start] + "// Form already initialized with recipe data\n" + html_content[init_end:]
+
+def step_sort_key(key):
+    """Sort step keys numerically so that step10 follows step9"""
+    num = key[len('step'):] if key.startswith('step') else key
+    return (0, int(num), '') if num.isdigit() else (1, 0, key)
+
+def generate_step_html(step_name, step_num, step_data):
+    """Generate the form block for one process step"""
+    id_prefix = f'{step_name}_{step_num}'
+    parts = [f'<div class="nested-section" id="{step_name}Step{step_num}"><h4>Step {step_num}</h4><div style="display: grid; grid-template-columns: repeat(5, minmax(0, 1fr)); gap: 20px; align-items: start;">']
+    for key, before_id, before_value in _STEP_FIELD_MARKUP:
+        if key in step_data:
+            parts.append(f'{before_id}{id_prefix}{before_value}{escape_value(step_data[key])}"></div>')
+    parts.append('</div></div>')
+    return ''.join(parts)
+
+def iter_steps_html(step_name, steps):
+    """Yield the form block for each step of a process section in step order"""
+    for key in sorted(steps, key=step_sort_key):
+        step_num = key[len('step'):] if key.startswith('step') else key
+        yield generate_step_html(step_name, step_num, steps[key])
+
+def iter_recipe_html(data, template=None):
+    """Return an iterator over the rendered form HTML fragments
+
+    Repeated sections are generated lazily while the template is walked, so
+    only one step or option block is materialised at a time.
+    """
+    if template is None:
+        template = load_template()
+
+    quality = get_path(data, ('qualityControl', 'quality'), {})
+    thickness = get_path(data, ('settings', 'thickness'), {})
+    ratio_water_flour = get_path(thickness, ('dispensing', 'weight', 'ratioWaterFlour'), {})
+
+    values = {
+        'title': escape_value(data['recipeName']),
+        'recipeId': escape_value(data['recipeId']),
+        'recipeName': escape_value(data['recipeName']),
+        'recipeVersion': escape_value(data['recipeVersion']),
+        'description': escape_value(data.get('description', '')),
+        'qualityOptions': iter_quality_options_html(quality),
+        'flourRatios': iter_flour_ratios_html(ratio_water_flour),
+        # Counts continue numbering after the pre-populated entries in JavaScript
+        'qualityOptionCount': str(len(quality) + 1),
+        'flourRatioCount': str(len(ratio_water_flour)),
+    }
+    for field_id, (path, default) in FORM_FIELDS.items():
+        values[field_id] = escape_value(get_path(data, path, default))
+    for step_name in STEP_SECTIONS:
+        values[f'{step_name}Steps'] = iter_steps_html(step_name, thickness.get(step_name, {}))
+
+    return template.iter_render(values)
+
+def render_recipe(data, template=None):
+    """Render recipe data into the form HTML using the compiled template"""
+    return ''.join(iter_recipe_html(data, template))
+
+def write_recipe_html(data, f, template=None):
+    """Stream the rendered form HTML to a text file handle"""
+    for fragment in iter_recipe_html(data, template):
+        f.write(fragment)
+
+def generate_html_from_json(json_path, html_path, logo_path, profile=None):
+    """Generate HTML file from JSON recipe data
+
+    With a RenderProfile, each stage is timed separately; the page fragments
+    are then collected before writing so rendering and writing can be told apart.
+    """
+    stage = (profile or NULL_PROFILE).stage
+
+    with stage('parse'):
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    with stage('template'):
+        template = load_template()
+    with stage('validate'):
+        check_recipe(data, str(json_path))
     
     # Write the HTML file
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    if profile is None:
+        with open(html_path, 'w', encoding='utf-8') as f:
+            write_recipe_html(data, f, template)
+    else:
+        with stage('render'):
+            fragments = list(iter_recipe_html(data, template))
+        with stage('write'):
+            with open(html_path, 'w', encoding='utf-8') as f:
+                f.writelines(fragments)
+        profile.recipes += 1
     
     print(f"Generated: {html_path}")
 
-def main():
-    """Generate HTML files for all recipes"""
-    recipes_dir = Path('Recipes')
-    html_dir = Path('HTML Files')
-    logo_path = Path('logo.jpg')
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file's contents"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def template_fingerprint(template_path=TEMPLATE_PATH):
+    """Fingerprint the template together with this generator's source"""
+    digest = hashlib.sha256()
+    digest.update(Path(__file__).read_bytes())
+    digest.update(Path(template_path).read_bytes())
+    return digest.hexdigest()
+
+def load_manifest(manifest_path):
+    """Load the build manifest, returning an empty one if missing or unreadable"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_manifest(manifest, manifest_path):
+    """Write the build manifest atomically"""
+    tmp_path = Path(f'{manifest_path}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def discover_recipes(recipes_dir=RECIPES_DIR, output_dir=HTML_DIR, template_path=TEMPLATE_PATH):
+    """Map every recipe JSON to its output HTML path, skipping the template itself"""
+    template = Path(template_path).resolve()
+    pairs = []
+    for json_path in sorted(Path(recipes_dir).glob('*.json')):
+        html_path = Path(output_dir) / f'{json_path.stem.lower()}.html'
+        if html_path.resolve() != template:
+            pairs.append((json_path, html_path))
+    return pairs
+
+def is_generated_page(html_path):
+    """Return True if html_path is missing or was written by this generator
+
+    Hand-written pages use their own field ids and have none of FORM_FIELDS.
+    """
+    try:
+        with open(html_path, 'r', encoding='utf-8') as f:
+            page = f.read()
+    except FileNotFoundError:
+        return True
+    return f'id="{next(iter(FORM_FIELDS))}"' in page
+
+def find_stale_recipes(pairs, manifest, template_hash, force=False):
+    """Return (json_path, html_path, manifest entry, fresh) for every recipe
+
+    Unchanged size and mtime are trusted without reading the file; otherwise the
+    content hash decides, so touched-but-identical inputs are not rebuilt.
+    """
+    entries = manifest.get('recipes', {}) if manifest.get('template') == template_hash else {}
+    stale = []
+    for json_path, html_path in pairs:
+        stat = json_path.stat()
+        entry = entries.get(str(json_path))
+        fresh = (
+            not force
+            and entry is not None
+            and entry['output'] == str(html_path)
+            and html_path.exists()
+        )
+        if fresh and (entry['mtime_ns'], entry['size']) != (stat.st_mtime_ns, stat.st_size):
+            fresh = entry['hash'] == file_digest(json_path)
+        new_entry = {
+            'output': str(html_path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'hash': entry['hash'] if fresh else file_digest(json_path),
+        }
+        stale.append((json_path, html_path, new_entry, fresh))
+    return stale
+
+def _build_one(paths, profile=False, trace_memory=False):
+    """Process pool worker: render one recipe
+
+    Returns (json_path, errors or None, profile counters or None).
+    """
+    json_path, html_path = paths
+    recipe_profile = RenderProfile(trace_memory) if profile else None
+    try:
+        if recipe_profile is None:
+            generate_html_from_json(json_path, html_path, LOGO_PATH)
+        else:
+            with recipe_profile.tracing():
+                generate_html_from_json(json_path, html_path, LOGO_PATH, recipe_profile)
+    except RecipeValidationError as e:
+        return json_path, e.errors, None
+    except (OSError, ValueError) as e:
+        # Unreadable JSON fails this recipe only, so the manifest is still saved
+        return json_path, [f'<recipe>: could not load JSON: {e}'], None
+    return json_path, None, recipe_profile.as_dict() if recipe_profile else None
+
+def build_all(recipes_dir=RECIPES_DIR, output_dir=HTML_DIR, manifest_path=MANIFEST_PATH, jobs=None, force=False,
+              profile=None):
+    """Regenerate stale outputs for every recipe in parallel, tracked by a content-hash manifest
+
+    Stage counters from every worker are merged into profile if one is given.
+    """
+    template_hash = template_fingerprint()
+    manifest = load_manifest(manifest_path)
+    # Outputs already in the manifest are ours; any other existing page is
+    # only overwritten if the generator wrote it
+    known = {entry['output'] for entry in manifest.get('recipes', {}).values()}
+    pairs = []
+    for json_path, html_path in discover_recipes(recipes_dir, output_dir):
+        if str(html_path) in known or is_generated_page(html_path):
+            pairs.append((json_path, html_path))
+        else:
+            print(f"Skipping hand-written page: {html_path}")
+    checked = find_stale_recipes(pairs, manifest, template_hash, force)
+    todo = [(json_path, html_path) for json_path, html_path, entry, fresh in checked if not fresh]
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    build_one = functools.partial(_build_one, profile=profile is not None,
+                                  trace_memory=profile is not None and profile.trace_memory)
+    if len(todo) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            workers = jobs or os.cpu_count() or 1
+            chunksize = max(1, len(todo) // (workers * 4))
+            results = list(pool.map(build_one, todo, chunksize=chunksize))
+    else:
+        results = [build_one(paths) for paths in todo]
+
+    if profile is not None:
+        for json_path, errors, counters in results:
+            if counters:
+                profile.merge(counters)
+    failed = {str(json_path): errors for json_path, errors, counters in results if errors}
+    for json_path, errors in failed.items():
+        print(f"Invalid: {json_path}")
+        for error in errors:
+            print(f"    {error}")
+
+    # Only recipes that still exist are kept, so deleted inputs drop out;
+    # invalid recipes are left out so they are retried on the next build
+    save_manifest({
+        'template': template_hash,
+        'recipes': {str(json_path): entry for json_path, html_path, entry, fresh in checked
+                    if str(json_path) not in failed},
+    }, manifest_path)
+    built = len(todo) - len(failed)
+    print(f"Built {built} of {len(checked)} recipes ({len(checked) - len(todo)} up to date"
+          + (f", {len(failed)} invalid)" if failed else ")"))
+    return built
+
+# Appended to the shared script: fills the form from the page's recipe JSON
+# using the template's own builders, so the ids match the full pages
+HYDRATE_JS = """
+        // Populate the shared form from the recipe JSON embedded in the page
+        (function () {
+            const data = JSON.parse(document.getElementById('recipe-json').textContent);
+            const formFields = __FORM_FIELDS__;
+            const stepSections = __STEP_SECTIONS__;
+
+            function getPath(obj, path, fallback) {
+                for (const key of path) {
+                    if (obj === null || typeof obj !== 'object' || !(key in obj)) return fallback;
+                    obj = obj[key];
+                }
+                return obj;
+            }
+
+            function stepNumber(key) {
+                const num = key.replace('step', '');
+                return /^\\d+$/.test(num) ? parseInt(num) : Infinity;
+            }
+
+            document.getElementById('recipeId').value = data.recipeId;
+            document.getElementById('recipeName').value = data.recipeName;
+            document.getElementById('recipeVersion').value = data.recipeVersion;
+            document.getElementById('description').value = data.description || '';
+            Object.keys(formFields).forEach(id => {
+                const value = getPath(data, formFields[id][0], formFields[id][1]);
+                document.getElementById(id).value = Array.isArray(value) ? value.join(',') : value;
+            });
+
+            const quality = getPath(data, ['qualityControl', 'quality'], {});
+            Object.keys(quality).forEach(key => addQualityOption(quality[key]));
+
+            const thickness = getPath(data, ['settings', 'thickness'], {});
+            const ratios = getPath(thickness, ['dispensing', 'weight', 'ratioWaterFlour'], {});
+            Object.keys(ratios).forEach(name => addFlourRatio(name, ratios[name]));
+
+            stepSections.forEach(stepName => {
+                const steps = thickness[stepName] || {};
+                Object.keys(steps)
+                    .sort((a, b) => stepNumber(a) - stepNumber(b))
+                    .forEach(key => createStepForm(`${stepName}Steps`, stepName, key.replace('step', ''), steps[key], stepName));
+            });
+        })();
+"""
+
+SPLIT_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} Recipe</title>
+    <link rel="stylesheet" href="{css}">
+</head>
+<body>
+    <script type="application/json" id="recipe-json">{payload}</script>
+    <script src="{js}"></script>
+</body>
+</html>
+"""
+
+def fingerprinted_name(stem, suffix, content):
+    """Return stem.<content hash>suffix, so a changed asset gets a new URL"""
+    return f"{stem}.{hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]}{suffix}"
+
+def split_template(template=None):
+    """Return the (css, form markup, script) every generated page has in common"""
+    if template is None:
+        template = load_template()
+    values = dict.fromkeys(template.slots, '')
+    values.update(qualityOptionCount='1', flourRatioCount='0')
+    page = template.render(values)
+    css = re.search(r'<style>(.*?)</style>', page, re.DOTALL).group(1)
+    markup = re.search(r'<body>(.*?)<script>', page, re.DOTALL).group(1)
+    script = re.search(r'<script>(.*)</script>', page, re.DOTALL).group(1)
+    return css, markup, script
+
+def build_shared_assets(template=None):
+    """Return {file name: content} for the fingerprinted stylesheet and script
+
+    The script inserts the form markup in front of itself, defines the
+    template's form functions, then populates the form from the page's
+    recipe JSON.
+    """
+    css, markup, script = split_template(template)
+    hydrate = (HYDRATE_JS
+               .replace('__FORM_FIELDS__', json.dumps({field_id: [list(path), default]
+                                                       for field_id, (path, default) in FORM_FIELDS.items()}))
+               .replace('__STEP_SECTIONS__', json.dumps(STEP_SECTIONS)))
+    js = (f"document.currentScript.insertAdjacentHTML('beforebegin', {json.dumps(markup)});\n"
+          + script.rstrip() + '\n' + hydrate)
+    return {
+        fingerprinted_name('recipe-form', '.css', css): css,
+        fingerprinted_name('recipe-form', '.js', js): js,
+    }
+
+def render_split_recipe(data, css_url, js_url):
+    """Render the small page for one recipe, which loads the shared assets"""
+    # Escaping '<' keeps '</script>' in a value from closing the data block
+    payload = json.dumps(data, separators=(',', ':')).replace('<', '\\u003c')
+    return SPLIT_PAGE.format(title=html.escape(data['recipeName']), css=css_url, js=js_url, payload=payload)
+
+def build_site(recipes_dir=RECIPES_DIR, site_dir=SITE_DIR, profile=None):
+    """Write a deployable site: the shared assets once and a small page per recipe
+
+    Pages go to <site>/HTML Files/ so the builder's links are unchanged.
+    Assets are written to <site>/assets/ under content-hashed names, and
+    older versions of them are removed. The JSON of every valid recipe is
+    copied to <site>/Recipes/. Pages and JSON of recipes that are gone or
+    invalid are removed.
+    """
+    stage = (profile or NULL_PROFILE).stage
+    site_dir = Path(site_dir)
+    pages_dir = site_dir / HTML_DIR.name
+    assets_dir = site_dir / 'assets'
+    # Recipe JSON stays published at Recipes/<name>.json, as in the whole-repository deploy
+    site_recipes_dir = site_dir / RECIPES_DIR.name
+    for directory in (pages_dir, assets_dir, site_recipes_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    with stage('template'):
+        assets = build_shared_assets()
+    for name, content in assets.items():
+        with open(assets_dir / name, 'w', encoding='utf-8') as f:
+            f.write(content)
+    for old in assets_dir.glob('recipe-form.*'):
+        if old.name not in assets:
+            old.unlink()
+    css_name, js_name = assets
+    css_url, js_url = f'../assets/{css_name}', f'../assets/{js_name}'
+
+    for name in SITE_FILES:
+        if Path(name).exists():
+            (site_dir / name).write_bytes(Path(name).read_bytes())
+
+    built = 0
+    published = set()
+    pages = set()
+    for json_path in sorted(Path(recipes_dir).glob('*.json')):
+        try:
+            with stage('parse'):
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            with stage('validate'):
+                check_recipe(data, str(json_path))
+        except RecipeValidationError as e:
+            print(f"Invalid: {json_path}")
+            for error in e.errors:
+                print(f"    {error}")
+            continue
+        except (OSError, ValueError) as e:
+            print(f"Invalid: {json_path}")
+            print(f"    <recipe>: could not load JSON: {e}")
+            continue
+        with stage('render'):
+            page = render_split_recipe(data, css_url, js_url)
+        page_name = f'{json_path.stem.lower()}.html'
+        with stage('write'):
+            with open(pages_dir / page_name, 'w', encoding='utf-8') as f:
+                f.write(page)
+            shutil.copyfile(json_path, site_recipes_dir / json_path.name)
+        published.add(json_path.name)
+        pages.add(page_name)
+        built += 1
+        if profile is not None:
+            profile.recipes += 1
+
+    # Recipes that were removed or became invalid drop out of the site
+    for old in site_recipes_dir.glob('*.json'):
+        if old.name not in published:
+            old.unlink()
+    for old in pages_dir.glob('*.html'):
+        if old.name not in pages:
+            old.unlink()
+
+    print(f"Wrote {built} recipe pages and {len(assets)} shared assets to {site_dir}")
+    return built
+
+def generate_listed_recipes(profile=None):
+    """Generate the HTML forms for the hard-coded recipe list, skipping existing files"""
+    recipes_dir = RECIPES_DIR
+    html_dir = HTML_DIR
+    logo_path = LOGO_PATH
     
     # Mapping of JSON files to HTML filenames
     recipe_mapping = {
@@ -321,11 +686,60 @@ def main():
         
         if json_path.exists():
             if not html_path.exists():
-                generate_html_from_json(json_path, html_path, logo_path)
+                try:
+                    if profile is None:
+                        generate_html_from_json(json_path, html_path, logo_path)
+                    else:
+                        with profile.tracing():
+                            generate_html_from_json(json_path, html_path, logo_path, profile)
+                except RecipeValidationError as e:
+                    print(f"Invalid: {json_path}")
+                    for error in e.errors:
+                        print(f"    {error}")
             else:
                 print(f"Skipping {html_file} (already exists)")
         else:
             print(f"Warning: {json_file} not found")
 
+def main():
+    """Generate HTML files for all recipes"""
+    parser = argparse.ArgumentParser(description='Generate HTML forms from recipe JSON files')
+    parser.add_argument('--build', action='store_true',
+                        help='incrementally build every Recipes/*.json using the build manifest')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes for --build (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='rebuild all outputs in --build mode')
+    parser.add_argument('--split', nargs='?', const=str(SITE_DIR), metavar='DIR',
+                        help='write a deployable site with shared CSS/JS assets and small per-recipe pages '
+                             f'to DIR (default: {SITE_DIR})')
+    parser.add_argument('--profile', action='store_true', help='print time spent in each render stage')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='with --profile, also count allocations per stage using tracemalloc')
+    parser.add_argument('--cprofile', metavar='FILE',
+                        help='write cProfile stats for the whole run to FILE (implies --jobs 1)')
+    args = parser.parse_args()
+
+    profile = RenderProfile(args.trace_memory) if args.profile or args.trace_memory else None
+    profiler = None
+    if args.cprofile:
+        # Workers in other processes would not be seen by the profiler
+        args.jobs = 1
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if args.split:
+            build_site(site_dir=args.split, profile=profile)
+        elif args.build:
+            build_all(jobs=args.jobs, force=args.force, profile=profile)
+        else:
+            generate_listed_recipes(profile)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+            print(f"Wrote cProfile stats to {args.cprofile}")
+    if profile is not None:
+        print(profile.report())
+
 if __name__ == '__main__':
     main()
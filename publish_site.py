@@ -0,0 +1,235 @@
+"""Publish a built site as deduplicated, content-addressed, precompressed files
+
+Every file of the source site (usually the output of
+`generate_html_files.py --split`) is stored once in <dist>/objects/ under its
+SHA-256 hash. Files with identical bytes, such as two recipes rendering to the
+same page, share one object. Each file's original path in <dist> is a hard
+link to its object, so existing URLs keep working. A copy is made where
+links are not supported.
+
+Files are hashed in chunks and only new objects are copied, so memory use
+does not grow with the size of the site.
+
+Text objects get .gz siblings, and .br siblings when the optional brotli
+module is installed. Each is compressed once per unique object. Objects kept
+from an earlier publish only get the siblings they are missing, such as .br
+after brotli has been installed. A static server
+can serve the precompressed bytes directly (e.g. nginx gzip_static /
+brotli_static). <dist>/publish-manifest.json maps every path, and every
+recipe name, to its hash.
+
+Files are only ever replaced, never rewritten in place, so hard-linked
+objects cannot be changed through their named paths.
+
+Only files recorded in the previous publish-manifest.json are deleted when
+they drop out of the site. A non-empty output directory without a manifest
+is refused.
+
+    python publish_site.py site -o dist
+    python publish_site.py variants -o dist-variants --pages . --jobs 8
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from generate_html_files import HTML_DIR, SITE_DIR, load_manifest, save_manifest
+
+DIST_DIR = Path('dist')
+OBJECTS_DIR = 'objects'
+MANIFEST_NAME = 'publish-manifest.json'
+
+# Suffixes worth precompressing; images are already compressed
+COMPRESSIBLE_SUFFIXES = {'.html', '.css', '.js', '.json', '.svg', '.txt'}
+
+# Read size when hashing, so files are never held in memory whole
+HASH_CHUNK_SIZE = 1 << 20
+
+def content_hash(path):
+    """Return the content address of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def compressed_variants(data, suffixes=None):
+    """Return {sibling suffix: compressed bytes} for the encodings available (or just suffixes)"""
+    variants = {}
+    if suffixes is None or '.gz' in suffixes:
+        variants['.gz'] = gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None and (suffixes is None or '.br' in suffixes):
+        variants['.br'] = brotli.compress(data, quality=11)
+    return variants
+
+def available_encodings():
+    """Sibling suffixes this installation can write"""
+    return ('.gz', '.br') if brotli is not None else ('.gz',)
+
+def replace_file(path, data=None, source=None, link=True):
+    """Write bytes to path, or hard link (or copy) source there, replacing any existing file atomically"""
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+    if source is not None:
+        try:
+            if not link:
+                raise OSError
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+    else:
+        tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+def _compress_object(task):
+    """Process pool worker: write the missing compressed siblings of one object; return their sizes"""
+    object_path, suffixes = task
+    data = object_path.read_bytes()
+    sizes = {}
+    for suffix, compressed in compressed_variants(data, suffixes).items():
+        # A sibling that saves nothing would only cost the server a stat;
+        # its size is still recorded so it is not compressed again
+        if len(compressed) < len(data):
+            replace_file(object_path.with_name(object_path.name + suffix), compressed)
+            sizes[suffix] = len(compressed)
+        else:
+            sizes[suffix] = len(data)
+    return object_path.name, sizes
+
+def missing_encodings(object_path, entry):
+    """Sibling suffixes an object should have but does not, given its manifest entry"""
+    missing = []
+    for suffix in available_encodings():
+        size = entry.get(suffix.lstrip('.'))
+        if size is None or (size < entry['bytes'] and not object_path.with_name(object_path.name + suffix).exists()):
+            missing.append(suffix)
+    return missing
+
+def collect_files(source_dir):
+    """Return {relative path: path} for every file of a site, skipping precompressed siblings"""
+    source_dir = Path(source_dir)
+    files = {}
+    for path in sorted(source_dir.rglob('*')):
+        if path.is_file() and path.suffix not in ('.gz', '.br'):
+            files[path.relative_to(source_dir).as_posix()] = path
+    return files
+
+def publish(source_dir=SITE_DIR, dist_dir=DIST_DIR, pages_dir=HTML_DIR.name, jobs=None):
+    """Publish source_dir into dist_dir; return (manifest, objects compressed this run)
+
+    Pages directly in source_dir/pages_dir are listed in the manifest by
+    recipe name (the page's file stem).
+    """
+    dist_dir = Path(dist_dir)
+    objects_dir = dist_dir / OBJECTS_DIR
+    previous_manifest = load_manifest(dist_dir / MANIFEST_NAME)
+    # Only paths a previous publish recorded are ever deleted, so refuse to
+    # take over a directory holding anything else
+    if not previous_manifest and dist_dir.is_dir() and any(dist_dir.iterdir()):
+        raise FileExistsError(f"{dist_dir} is not empty and has no {MANIFEST_NAME}; refusing to publish into it")
+    objects_dir.mkdir(parents=True, exist_ok=True)
+    previous = previous_manifest.get('objects', {})
+
+    files = {}
+    objects = {}
+    todo = []
+    for rel_path, path in collect_files(source_dir).items():
+        object_name = content_hash(path) + path.suffix
+        files[rel_path] = object_name
+        if object_name in objects:
+            continue
+        object_path = objects_dir / object_name
+        entry = previous.get(object_name) if object_path.exists() else None
+        if entry is None:
+            # Copied, not linked: the site's own files may be rewritten in place
+            replace_file(object_path, source=path, link=False)
+            entry = {'bytes': object_path.stat().st_size}
+        objects[object_name] = entry
+        if path.suffix in COMPRESSIBLE_SUFFIXES:
+            missing = missing_encodings(object_path, entry)
+            if missing:
+                todo.append((object_path, missing))
+
+    if len(todo) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            workers = jobs or os.cpu_count() or 1
+            results = list(pool.map(_compress_object, todo, chunksize=max(1, len(todo) // (workers * 4))))
+    else:
+        results = [_compress_object(task) for task in todo]
+    for object_name, sizes in results:
+        objects[object_name].update({suffix.lstrip('.'): size for suffix, size in sizes.items()})
+
+    # Named paths and their siblings are hard links into objects/
+    expected = {MANIFEST_NAME}
+    for rel_path, object_name in files.items():
+        target = dist_dir / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        for suffix in ('', '.gz', '.br'):
+            source = objects_dir / (object_name + suffix)
+            if source.exists():
+                replace_file(target.with_name(target.name + suffix), source=source)
+                expected.add(rel_path + suffix)
+
+    # Drop objects and named files the previous publish wrote that are no
+    # longer part of the site; nothing else in dist_dir is touched
+    live = {name + suffix for name in objects for suffix in ('', '.gz', '.br')}
+    for name in previous:
+        for suffix in ('', '.gz', '.br'):
+            if name + suffix not in live:
+                (objects_dir / (name + suffix)).unlink(missing_ok=True)
+    for rel_path in previous_manifest.get('files', {}):
+        for suffix in ('', '.gz', '.br'):
+            if rel_path + suffix not in expected:
+                (dist_dir / (rel_path + suffix)).unlink(missing_ok=True)
+
+    pages_prefix = f'{pages_dir}/' if pages_dir not in ('', '.') else ''
+    recipes = {
+        Path(rel_path).stem: object_name.split('.', 1)[0]
+        for rel_path, object_name in files.items()
+        if rel_path.startswith(pages_prefix) and '/' not in rel_path[len(pages_prefix):]
+        and rel_path.endswith('.html')
+    }
+    manifest = {'recipes': recipes, 'files': files, 'objects': objects}
+    save_manifest(manifest, dist_dir / MANIFEST_NAME)
+    return manifest, len(todo)
+
+def summarise(manifest, compressed):
+    """Return a one-line summary of a publish"""
+    objects = manifest['objects'].values()
+    raw = sum(entry['bytes'] for entry in objects)
+    line = (f"Published {len(manifest['files'])} files as {len(manifest['objects'])} objects "
+            f"({len(manifest['recipes'])} recipes), {raw / 1024:.0f} KB raw")
+    for encoding in ('gz', 'br'):
+        if any(encoding in entry for entry in objects):
+            size = sum(entry.get(encoding, entry['bytes']) for entry in objects)
+            line += f", {size / 1024:.0f} KB {encoding}"
+    return line + f"; compressed {compressed} objects"
+
+def main():
+    parser = argparse.ArgumentParser(description='Publish a site as content-addressed, precompressed files')
+    parser.add_argument('source_dir', nargs='?', default=str(SITE_DIR), help='built site to publish')
+    parser.add_argument('-o', '--output-dir', default=str(DIST_DIR))
+    parser.add_argument('--pages', default=HTML_DIR.name,
+                        help='directory of recipe pages inside the site, listed by name in the manifest')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("brotli is not installed; writing .gz siblings only")
+    try:
+        manifest, compressed = publish(args.source_dir, args.output_dir, args.pages, args.jobs)
+    except FileExistsError as e:
+        parser.error(str(e))
+    print(summarise(manifest, compressed))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""Columnar store of recipe parameters for corpus-wide queries
+
+Every recipe is flattened into dotted parameter paths
+(settings.thickness.heating.temperature.topRoast,
+settings.thickness.roasting.step3.duration, ...). Each path becomes one NumPy
+column: numbers are stored as float64, and per-thickness arrays become
+(recipes, width) matrices padded with NaN. Text leaves such as step
+commands and quality notes become string columns. Rows are indexed by
+(recipeId, recipeVersion).
+
+Requires NumPy.
+
+    python recipe_store.py import Recipes -o recipes.npz
+    python recipe_store.py query recipes.npz settings.thickness.heating.temperature.topRoast ">" 240 --thickness thick
+    python recipe_store.py stats recipes.npz settings.thickness.dispensing.weight.oil
+"""
+import argparse
+import json
+import operator
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+from generate_html_files import RECIPES_DIR
+
+# Index of each thickness level in the per-thickness arrays
+THICKNESS_LEVELS = {'thin': 0, 'medium': 1, 'thick': 2}
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+def flatten_recipe(data, prefix=''):
+    """Yield (dotted path, leaf value) for every leaf of a recipe; lists are leaves"""
+    for key, value in data.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            yield from flatten_recipe(value, f'{path}.')
+        else:
+            yield path, value
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _thickness_index(thickness):
+    """Resolve a thickness level name or index"""
+    if thickness is None or isinstance(thickness, int):
+        return thickness
+    try:
+        return THICKNESS_LEVELS[thickness]
+    except KeyError:
+        raise ValueError(f"Unknown thickness '{thickness}', expected one of {', '.join(THICKNESS_LEVELS)}")
+
+class RecipeStore:
+    """Recipe parameters stored column-wise with an index by recipe id and version"""
+
+    def __init__(self, ids, versions, names, sources, columns, text_columns):
+        self.ids = ids
+        self.versions = versions
+        self.names = names
+        self.sources = sources
+        self.columns = columns
+        self.text_columns = text_columns
+        self.index = {(int(i), str(v)): row for row, (i, v) in enumerate(zip(ids, versions))}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_recipes(cls, recipes, sources=None):
+        """Build a store from parsed recipe dicts"""
+        recipes = list(recipes)
+        n = len(recipes)
+        leaves = {}
+        for row, data in enumerate(recipes):
+            for path, value in flatten_recipe(data):
+                leaves.setdefault(path, {})[row] = value
+
+        columns = {}
+        text_columns = {}
+        for path, values in leaves.items():
+            if all(_is_number(v) for v in values.values()):
+                column = np.full(n, np.nan)
+                for row, value in values.items():
+                    column[row] = value
+                columns[path] = column
+            elif all(isinstance(v, list) and all(_is_number(x) for x in v) for v in values.values()):
+                width = max(len(v) for v in values.values())
+                column = np.full((n, width), np.nan)
+                for row, value in values.items():
+                    column[row, :len(value)] = value
+                columns[path] = column
+            else:
+                column = np.full(n, '', dtype=object)
+                for row, value in values.items():
+                    column[row] = value if isinstance(value, str) else json.dumps(value)
+                text_columns[path] = column.astype(str)
+
+        return cls(
+            ids=np.array([data.get('recipeId', -1) for data in recipes], dtype=np.int64),
+            versions=np.array([str(data.get('recipeVersion', '')) for data in recipes], dtype=str),
+            names=np.array([data.get('recipeName', '') for data in recipes], dtype=str),
+            sources=np.array(sources if sources is not None else [''] * n, dtype=str),
+            columns=columns,
+            text_columns=text_columns,
+        )
+
+    @classmethod
+    def import_dir(cls, recipes_dir=RECIPES_DIR):
+        """Import every *.json recipe in a directory"""
+        recipes = []
+        sources = []
+        for json_path in sorted(Path(recipes_dir).glob('*.json')):
+            with open(json_path, 'r', encoding='utf-8') as f:
+                recipes.append(json.load(f))
+            sources.append(str(json_path))
+        return cls.from_recipes(recipes, sources)
+
+    def save(self, path):
+        """Save the store as a compressed .npz archive"""
+        arrays = {
+            'index.ids': self.ids,
+            'index.versions': self.versions,
+            'index.names': self.names,
+            'index.sources': self.sources,
+        }
+        arrays.update({f'num:{path}': column for path, column in self.columns.items()})
+        arrays.update({f'text:{path}': column for path, column in self.text_columns.items()})
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Load a store written by save()"""
+        with np.load(path, allow_pickle=False) as archive:
+            columns = {}
+            text_columns = {}
+            for key in archive.files:
+                kind, _, column_path = key.partition(':')
+                if kind == 'num':
+                    columns[column_path] = archive[key]
+                elif kind == 'text':
+                    text_columns[column_path] = archive[key]
+            return cls(
+                ids=archive['index.ids'],
+                versions=archive['index.versions'],
+                names=archive['index.names'],
+                sources=archive['index.sources'],
+                columns=columns,
+                text_columns=text_columns,
+            )
+
+    def paths(self, prefix=''):
+        """Return the sorted parameter paths starting with prefix"""
+        return sorted(p for p in (*self.columns, *self.text_columns) if p.startswith(prefix))
+
+    def row(self, recipe_id, version=None):
+        """Return the row for a recipe id, optionally pinned to a version (last imported row otherwise)"""
+        if version is not None:
+            return self.index[(int(recipe_id), str(version))]
+        rows = np.flatnonzero(self.ids == recipe_id)
+        if len(rows) == 0:
+            raise KeyError(recipe_id)
+        return int(rows[-1])
+
+    def column(self, path, thickness=None):
+        """Return a numeric column, optionally reduced to one thickness level"""
+        try:
+            column = self.columns[path]
+        except KeyError:
+            if path in self.text_columns:
+                return self.text_columns[path]
+            raise KeyError(f"Unknown parameter path '{path}'")
+        index = _thickness_index(thickness)
+        if index is None:
+            return column
+        if column.ndim != 2:
+            raise ValueError(f"'{path}' is not a per-thickness array")
+        return column[:, index]
+
+    def where(self, path, op, value, thickness=None, reduce='any'):
+        """Return a boolean row mask for `column op value`
+
+        For array columns without a thickness, reduce='any' or 'all' decides
+        how the per-element results combine. Missing values never match, and
+        the padding of arrays shorter than the column does not fail 'all'.
+        Text columns only compare with strings.
+        """
+        column = self.column(path, thickness)
+        compare = OPERATORS[op]
+        if column.dtype.kind in 'US':
+            if not isinstance(value, str):
+                raise ValueError(f"'{path}' is a text column; compare it with a string, not {value!r}")
+            return compare(column, value)
+        missing = np.isnan(column)
+        with np.errstate(invalid='ignore'):
+            mask = compare(column, value) & ~missing
+        if mask.ndim == 2:
+            if reduce == 'any':
+                mask = mask.any(axis=1)
+            else:
+                # NaN padding past the end of a shorter array is not a failed match
+                mask = (mask | missing).all(axis=1) & (~missing).any(axis=1)
+        return mask
+
+    def select(self, mask):
+        """Return (recipeId, recipeVersion, recipeName) for rows where mask is true"""
+        rows = np.flatnonzero(mask)
+        return [(int(self.ids[r]), str(self.versions[r]), str(self.names[r])) for r in rows]
+
+    def stats(self, path, thickness=None, percentiles=(50, 90, 99)):
+        """Return min/max/mean and percentiles over the corpus, per thickness for arrays"""
+        column = self.column(path, thickness)
+        if column.dtype.kind in 'US':
+            raise ValueError(f"'{path}' is a text column")
+        with warnings.catch_warnings():
+            # All-NaN slices (a parameter no recipe defines) yield NaN rather than warn
+            warnings.simplefilter('ignore', RuntimeWarning)
+            result = {
+                'count': np.count_nonzero(~np.isnan(column), axis=0).tolist(),
+                'min': np.nanmin(column, axis=0).tolist(),
+                'max': np.nanmax(column, axis=0).tolist(),
+                'mean': np.nanmean(column, axis=0).tolist(),
+            }
+            for q in percentiles:
+                result[f'p{q}'] = np.nanpercentile(column, q, axis=0).tolist()
+        return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Columnar store of recipe parameters')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_cmd = commands.add_parser('import', help='import recipe JSON files into a store')
+    import_cmd.add_argument('recipes_dir', nargs='?', default=str(RECIPES_DIR))
+    import_cmd.add_argument('-o', '--output', default='recipes.npz')
+
+    query_cmd = commands.add_parser('query', help='list recipes where a parameter matches')
+    query_cmd.add_argument('store')
+    query_cmd.add_argument('path')
+    query_cmd.add_argument('op', choices=sorted(OPERATORS))
+    query_cmd.add_argument('value')
+    query_cmd.add_argument('--thickness', help='thin, medium, thick or an index')
+    query_cmd.add_argument('--all', action='store_true', help='require every array element to match')
+
+    stats_cmd = commands.add_parser('stats', help='summarise a parameter over the corpus')
+    stats_cmd.add_argument('store')
+    stats_cmd.add_argument('path')
+    stats_cmd.add_argument('--thickness', help='thin, medium, thick or an index')
+
+    paths_cmd = commands.add_parser('paths', help='list parameter paths')
+    paths_cmd.add_argument('store')
+    paths_cmd.add_argument('prefix', nargs='?', default='')
+
+    args = parser.parse_args()
+    if args.command == 'import':
+        store = RecipeStore.import_dir(args.recipes_dir)
+        store.save(args.output)
+        print(f"Imported {len(store)} recipes, {len(store.columns) + len(store.text_columns)} columns -> {args.output}")
+        return
+
+    store = RecipeStore.load(args.store)
+    thickness = getattr(args, 'thickness', None)
+    if thickness is not None and thickness.isdigit():
+        thickness = int(thickness)
+    if args.command == 'paths':
+        print('\n'.join(store.paths(args.prefix)))
+        return
+
+    if args.path not in store.columns and args.path not in store.text_columns:
+        parser.error(f"unknown parameter path '{args.path}' (see the 'paths' command)")
+    try:
+        if args.command == 'query':
+            value = args.value
+            if args.path not in store.text_columns:
+                try:
+                    value = float(args.value)
+                except ValueError:
+                    parser.error(f"'{args.path}' is numeric; '{args.value}' is not a number")
+            mask = store.where(args.path, args.op, value, thickness, 'all' if args.all else 'any')
+            for recipe_id, version, name in store.select(mask):
+                print(f"{recipe_id}\t{version}\t{name}")
+        else:
+            print(json.dumps(store.stats(args.path, thickness), indent=4))
+    except (ValueError, IndexError) as e:
+        # Bad thickness levels, or stats of a text column
+        parser.error(str(e))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""Recipe variant sweeps and structural diffs
+
+A sweep takes a base recipe and a parameter grid and produces one variant per
+grid point. Each grid axis scales, offsets or sets one or more numeric leaves
+(dotted paths, as in recipe_store.py):
+
+    [
+        {"path": "settings.thickness.dispensing.weight.oil", "op": "scale", "values": [0.9, 1.0, 1.1]},
+        {"path": "settings.roastLevel.duration", "op": "offset", "values": [0, 5]},
+        {"path": ["qualityControl.softness.upLimit", "qualityControl.softness.downLimit"],
+         "op": "scale", "values": [1.0, 0.8]}
+    ]
+
+The new values for every grid point are computed at once with NumPy
+broadcasting. Variants share every unchanged subtree with the base recipe,
+so building one copies only the dicts on the changed paths. It also lets
+diff_recipes skip shared subtrees by identity.
+
+Requires NumPy.
+
+    python recipe_sweep.py sweep Recipes/Plain_Poori.json --grid grid.json -o variants/ --html
+    python recipe_sweep.py sweep Recipes/Plain_Poori.json --axis settings.thickness.dispensing.weight.oil scale 0.9,1,1.1 -o variants/
+    python recipe_sweep.py diff Recipes/Plain_Poori.json variants/plain_poori_0001.json
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from generate_html_files import write_recipe_html
+from validate_recipes import RecipeValidationError, check_recipe
+
+OPS = {
+    'scale': np.multiply,
+    'offset': np.add,
+    'set': lambda base, value: np.broadcast_to(value, np.broadcast_shapes(base.shape, value.shape)),
+}
+
+# Decimal places kept for float results, so 2.6 * 1.1 is written as 2.86
+FLOAT_DECIMALS = 6
+
+class _Missing:
+    def __repr__(self):
+        return '<missing>'
+
+MISSING = _Missing()
+
+def split_path(path):
+    """Split a dotted path into its keys"""
+    return tuple(path.split('.')) if isinstance(path, str) else tuple(path)
+
+def get_leaf(data, keys):
+    """Return the value at a key path, raising KeyError naming the path"""
+    for key in keys:
+        try:
+            data = data[key]
+        except (KeyError, TypeError):
+            raise KeyError(f"Recipe has no parameter '{'.'.join(keys)}'")
+    return data
+
+def replace_leaves(base, updates):
+    """Return base with the leaves at each key path replaced, sharing all untouched subtrees"""
+    root = dict(base)
+    copied = {(): root}
+    for keys, value in updates:
+        node = root
+        for depth in range(1, len(keys)):
+            prefix = keys[:depth]
+            child = copied.get(prefix)
+            if child is None:
+                child = dict(node[keys[depth - 1]])
+                node[keys[depth - 1]] = child
+                copied[prefix] = child
+            node = child
+        node[keys[-1]] = value
+    return root
+
+def normalise_grid(grid):
+    """Return [(key paths, op, values array)] for a grid given as dicts or tuples"""
+    axes = []
+    for axis in grid:
+        if isinstance(axis, dict):
+            paths, op, values = axis['path'], axis.get('op', 'scale'), axis['values']
+        else:
+            paths, op, values = axis
+        if isinstance(paths, str):
+            paths = [paths]
+        if op not in OPS:
+            raise ValueError(f"Unknown sweep op '{op}', expected one of {', '.join(OPS)}")
+        axes.append(([split_path(p) for p in paths], op, np.asarray(values, dtype=float)))
+    return axes
+
+def sweep_values(base, grid):
+    """Compute the swept leaf values for every grid point
+
+    Returns (count, {key path: list of per-variant values}). Variant i uses
+    the i-th point of the grid's cartesian product, with the last axis
+    varying fastest.
+    """
+    axes = normalise_grid(grid)
+    shape = [len(values) for _, _, values in axes]
+    count = int(np.prod(shape)) if shape else 1
+    # Per axis, the grid value each variant takes along that axis
+    grid_index = np.indices(shape).reshape(len(shape), -1) if shape else np.zeros((0, 1), dtype=int)
+
+    columns = {}
+    for axis, (paths, op, values) in enumerate(axes):
+        factors = values[grid_index[axis]]
+        for keys in paths:
+            current = columns.get(keys)
+            if current is None:
+                leaf = get_leaf(base, keys)
+                current = np.broadcast_to(np.asarray(leaf, dtype=float), (count,) + np.shape(leaf))
+            factor = factors.reshape((count,) + (1,) * (current.ndim - 1))
+            columns[keys] = OPS[op](current, factor)
+
+    results = {}
+    for keys, column in columns.items():
+        leaf = get_leaf(base, keys)
+        flat = leaf if isinstance(leaf, list) else [leaf]
+        if all(isinstance(x, int) and not isinstance(x, bool) for x in flat):
+            column = np.rint(column).astype(np.int64)
+        else:
+            column = np.round(column, FLOAT_DECIMALS)
+        results[keys] = column.tolist()
+    return count, results
+
+def iter_variants(base, grid, tag_versions=True):
+    """Yield one recipe dict per grid point of the sweep
+
+    With tag_versions, each variant's recipeVersion gets a '+sweep.<i>'
+    suffix so variants stay distinct when indexed by id and version.
+    """
+    count, results = sweep_values(base, grid)
+    items = list(results.items())
+    version_keys = ('recipeVersion',)
+    for i in range(count):
+        updates = [(keys, values[i]) for keys, values in items]
+        if tag_versions:
+            updates.append((version_keys, f"{base.get('recipeVersion', '')}+sweep.{i}"))
+        yield replace_leaves(base, updates)
+
+def diff_recipes(a, b, prefix=''):
+    """Yield (dotted path, old, new) for every leaf that differs between two recipes
+
+    Subtrees that are the same object, or compare equal, are skipped without
+    being walked, so diffing a variant against its base only visits the
+    changed paths. Missing keys are reported as MISSING.
+    """
+    if a is b:
+        return
+    if not (isinstance(a, dict) and isinstance(b, dict)):
+        if a != b:
+            yield prefix, a, b
+        return
+    if a == b:
+        return
+    keys = a.keys() if a.keys() == b.keys() else a.keys() | b.keys()
+    for key in keys:
+        path = f'{prefix}.{key}' if prefix else key
+        yield from diff_recipes(a.get(key, MISSING), b.get(key, MISSING), path)
+
+def write_variants(base, grid, output_dir, stem, html=False):
+    """Write every variant as <stem>_<i>.json (and .html with html=True); return the count
+
+    With html=True each variant is validated first. Invalid variants are
+    reported and get no form, since a sweep can push values out of range.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for i, variant in enumerate(iter_variants(base, grid)):
+        name = f'{stem}_{i:04d}'
+        json_path = output_dir / f'{name}.json'
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(variant, f, indent=4)
+        if html:
+            html_path = output_dir / f'{name}.html'
+            try:
+                check_recipe(variant, str(json_path))
+            except RecipeValidationError as e:
+                print(f"Invalid: {json_path}")
+                for error in e.errors:
+                    print(f"    {error}")
+                html_path.unlink(missing_ok=True)
+            else:
+                with open(html_path, 'w', encoding='utf-8') as f:
+                    write_recipe_html(variant, f)
+        count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description='Recipe variant sweeps and structural diffs')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sweep_cmd = commands.add_parser('sweep', help='write one variant per grid point')
+    sweep_cmd.add_argument('base', help='base recipe JSON')
+    sweep_cmd.add_argument('--grid', help='JSON file with a list of {path, op, values} axes')
+    sweep_cmd.add_argument('--axis', nargs=3, action='append', default=[], metavar=('PATH', 'OP', 'VALUES'),
+                           help='add an axis, e.g. settings.roastLevel.duration offset 0,5,10')
+    sweep_cmd.add_argument('-o', '--output-dir', default='variants')
+    sweep_cmd.add_argument('--html', action='store_true', help='also render each variant form')
+
+    diff_cmd = commands.add_parser('diff', help='list changed parameter paths between two recipes')
+    diff_cmd.add_argument('a')
+    diff_cmd.add_argument('b')
+
+    args = parser.parse_args()
+    if args.command == 'sweep':
+        with open(args.base, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        grid = []
+        if args.grid:
+            with open(args.grid, 'r', encoding='utf-8') as f:
+                grid.extend(json.load(f))
+        for path, op, values in args.axis:
+            grid.append({'path': path, 'op': op, 'values': [float(v) for v in values.split(',')]})
+        count = write_variants(base, grid, args.output_dir, Path(args.base).stem.lower(), args.html)
+        print(f"Wrote {count} variants to {args.output_dir}")
+    else:
+        recipes = []
+        for path in (args.a, args.b):
+            with open(path, 'r', encoding='utf-8') as f:
+                recipes.append(json.load(f))
+        for path, old, new in diff_recipes(*recipes):
+            print(f"{path}: {json.dumps(old) if old is not MISSING else old} -> {json.dumps(new) if new is not MISSING else new}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""Local HTTP render service for recipe forms
+
+Serves /recipe/<name>.html and /recipe/<name>.json, where <name> is the
+lowercased JSON file stem (e.g. /recipe/jowar_bhakri.html). The compiled
+template stays loaded and parsed recipes are held in an LRU cache bounded
+by size. A cache entry is reused while the recipe file's mtime and size are
+unchanged, and the rendered page is reused while the template is unchanged.
+
+    python render_server.py --port 8001
+"""
+import argparse
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from generate_html_files import RECIPES_DIR, load_template, render_recipe
+from validate_recipes import check_recipe
+
+class CacheEntry:
+    """Parsed recipe with its raw JSON and lazily rendered HTML"""
+
+    def __init__(self, stat, raw, source='<recipe>'):
+        self.stat = stat
+        self.data = json.loads(raw)
+        check_recipe(self.data, source)
+        self.json_body = raw
+        self.json_etag = make_etag(raw)
+        self.data_size = parsed_size(self.data)
+        self.template = None
+        self.html_body = None
+        self.html_etag = None
+
+    @property
+    def size(self):
+        return self.data_size + len(self.json_body) + len(self.html_body or b'')
+
+def parsed_size(value):
+    """Estimate the bytes held by parsed JSON, counting every container, key and leaf
+
+    Shared keys and small ints are counted at each use, so this errs high.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + parsed_size(item)
+    elif isinstance(value, list):
+        for item in value:
+            size += parsed_size(item)
+    return size
+
+def make_etag(body):
+    """Return a strong ETag for a response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+class RecipeCache:
+    """Thread-safe LRU cache of parsed recipes, evicting by total bytes held"""
+
+    def __init__(self, recipes_dir=RECIPES_DIR, max_bytes=64 * 1024 * 1024):
+        self.recipes_dir = Path(recipes_dir)
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.paths = {}
+        self.scanned_mtime = None
+        self.lock = threading.Lock()
+
+    def find(self, name):
+        """Return the JSON path for a recipe name
+
+        On a miss the directory is rescanned only if its mtime changed since
+        the last scan, so repeated requests for unknown names cost one stat.
+        """
+        with self.lock:
+            path = self.paths.get(name)
+            if path is None:
+                try:
+                    mtime = self.recipes_dir.stat().st_mtime_ns
+                except FileNotFoundError:
+                    return None
+                if mtime != self.scanned_mtime:
+                    self.paths = {p.stem.lower(): p for p in self.recipes_dir.glob('*.json')}
+                    self.scanned_mtime = mtime
+                    path = self.paths.get(name)
+        return path
+
+    def get(self, name):
+        """Return an up-to-date CacheEntry for name, or None if there is no such recipe"""
+        path = self.find(name)
+        if path is None:
+            return None
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            with self.lock:
+                self.paths.pop(name, None)
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is not None and entry.stat == key:
+                self.entries.move_to_end(name)
+                return entry
+
+        entry = CacheEntry(key, path.read_bytes(), str(path))
+        self.store(name, entry)
+        return entry
+
+    def html(self, name, entry):
+        """Return (body, etag) for the rendered page, rendering if the template changed"""
+        template = load_template()
+        if entry.template is not template:
+            body = render_recipe(entry.data, template).encode('utf-8')
+            with self.lock:
+                if self.entries.get(name) is entry:
+                    self.total_bytes += len(body) - len(entry.html_body or b'')
+                entry.html_body = body
+                entry.html_etag = make_etag(body)
+                entry.template = template
+                self.evict()
+        return entry.html_body, entry.html_etag
+
+    def store(self, name, entry):
+        """Insert or replace the entry for name"""
+        with self.lock:
+            old = self.entries.pop(name, None)
+            if old is not None:
+                self.total_bytes -= old.size
+            self.entries[name] = entry
+            self.total_bytes += entry.size
+            self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until under max_bytes; caller holds the lock"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.total_bytes -= old.size
+
+class RenderHandler(BaseHTTPRequestHandler):
+    """Serve rendered recipe forms and recipe JSON with ETag revalidation"""
+
+    cache = None
+    # Keep-alive lets the tuning UI reuse connections between requests
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if not path.startswith('/recipe/'):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        name, _, ext = path[len('/recipe/'):].rpartition('.')
+        if ext not in ('html', 'json'):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        try:
+            entry = self.cache.get(name)
+            if entry is None:
+                self.send_error(HTTPStatus.NOT_FOUND, f"Unknown recipe: {name}")
+                return
+            if ext == 'html':
+                body, etag = self.cache.html(name, entry)
+                content_type = 'text/html; charset=utf-8'
+            else:
+                body, etag = entry.json_body, entry.json_etag
+                content_type = 'application/json; charset=utf-8'
+        except (OSError, ValueError, KeyError) as e:
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"Could not render {name}: {e}")
+            return
+
+        if etag in self.headers.get('If-None-Match', ''):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def make_server(host='127.0.0.1', port=8001, recipes_dir=RECIPES_DIR, cache_bytes=64 * 1024 * 1024, verbose=False):
+    """Create a render server bound to host:port with its own recipe cache"""
+    handler = type('BoundRenderHandler', (RenderHandler,), {'cache': RecipeCache(recipes_dir, cache_bytes)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.verbose = verbose
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve rendered recipe forms over HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--recipes-dir', default=str(RECIPES_DIR))
+    parser.add_argument('--cache-mb', type=float, default=64, help='recipe cache size limit in MB')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.recipes_dir, int(args.cache_mb * 1024 * 1024), args.verbose)
+    print(f"Serving recipes from {args.recipes_dir} on http://{args.host}:{args.port}/recipe/<name>.html")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
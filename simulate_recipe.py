@@ -0,0 +1,278 @@
+"""Machine timeline simulator: cycle time and throughput from a recipe's steps
+
+Each process section is timed per thickness from its step data:
+
+- kneader steps (no module) move the vertical axis to vtPosition at vtSpeed,
+  then knead for knDuration
+- module steps (kr, wp) travel from the module's current position to
+  position at speed, then to upPosition at upSpeed, plus any duration and
+  holdTime; timer steps only wait for duration
+- the roasting step named by settings.roastLevel.step also gets
+  roastLevel.duration for the chosen roast level (1-5)
+
+Durations are in ms, positions in mm and speeds in mm/s. Each module keeps
+one position, carried from step to step and from one roti to the next.
+Plate heating is not modelled; the setpoints are assumed reached.
+
+Sections that share a module run one after another, so they form a station.
+Stations with disjoint modules (the kneader and the kr/wp line) work on
+consecutive rotis at the same time. The slowest station therefore sets the
+seconds per roti, and its longest section is reported as the bottleneck.
+
+Requires NumPy. Recipes with the same step layout are simulated together as
+(recipes, thickness) arrays, so thousands of candidates rank in one pass.
+
+    python simulate_recipe.py show Recipes/Crisp_Roti.json --roast-level 5
+    python simulate_recipe.py rank Recipes variants --thickness medium --top 10
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from generate_html_files import RECIPES_DIR, STEP_SECTIONS, step_sort_key
+from recipe_store import THICKNESS_LEVELS
+from validate_recipes import RecipeValidationError, check_recipe
+
+MS_PER_SECOND = 1000.0
+
+# Resource used by kneader steps, which carry vt/kn fields instead of a module
+KNEADER = 'kneader'
+
+# Waiting on a timer does not occupy any machine module
+TIMER_MODULE = 'timer'
+
+ROAST_LEVELS = 5
+DEFAULT_ROAST_LEVEL = 3
+
+def load_recipe(json_path):
+    """Load and validate a recipe the way generate_html_from_json does"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    check_recipe(data, str(json_path))
+    return data
+
+def iter_steps(data, section):
+    """Yield (step key, step data) for a section in step order"""
+    steps = data['settings']['thickness'].get(section, {})
+    for key in sorted(steps, key=step_sort_key):
+        yield key, steps[key]
+
+def step_layout(data):
+    """Return a hashable description of a recipe's steps; recipes sharing it simulate together"""
+    thickness = data['settings']['thickness']
+    # Step order as written in the file; the same steps written in another order only form another group
+    return (data['settings']['roastLevel']['step'],) + tuple(
+        tuple((key, step.get('module', KNEADER), tuple(step)) for key, step in thickness.get(section, {}).items())
+        for section in STEP_SECTIONS
+    )
+
+def find_stations(data):
+    """Group sections that share a machine module; return [(station name, [section indexes])]"""
+    resources = []
+    for section in STEP_SECTIONS:
+        used = {step.get('module', KNEADER) for key, step in iter_steps(data, section)}
+        resources.append(used - {TIMER_MODULE})
+
+    stations = []
+    for index, used in enumerate(resources):
+        merged = [station for station in stations if station[0] & used]
+        for station in merged:
+            stations.remove(station)
+        modules = set(used).union(*(station[0] for station in merged))
+        sections = sorted([index, *(i for station in merged for i in station[1])])
+        stations.append((modules, sections))
+    stations.sort(key=lambda station: station[1][0])
+    return [('+'.join(sorted(modules)) or 'timer', sections) for modules, sections in stations]
+
+def _travel(positions, module, target, speed):
+    """Seconds to move module to target at speed; updates the module's position"""
+    distance = np.abs(target - positions.get(module, 0.0))
+    positions[module] = target
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(distance == 0, 0.0, distance / speed)
+
+def _simulate_layout(recipes, roast_level):
+    """Simulate recipes sharing one step layout; return (recipes, sections, thickness) stage seconds"""
+    base = recipes[0]
+    count = len(recipes)
+
+    roast_step = f"step{base['settings']['roastLevel']['step']}"
+    roast_extra = np.array([r['settings']['roastLevel']['duration'][roast_level - 1] for r in recipes],
+                           dtype=float)[:, None] / MS_PER_SECOND
+
+    paths = []
+    steps = []
+    for section_index, section in enumerate(STEP_SECTIONS):
+        for key, step in iter_steps(base, section):
+            fields = [field for field, value in step.items() if isinstance(value, list)]
+            paths.extend((section, key, field) for field in fields)
+            roasted = section == 'roasting' and key == roast_step
+            steps.append((section_index, step.get('module', KNEADER), fields, roasted))
+
+    # Every per-thickness field of every recipe in one (recipes, fields, thickness) array
+    values = np.array([[r[section][key][field] for section, key, field in paths]
+                       for r in (data['settings']['thickness'] for data in recipes)], dtype=float)
+    values = values.reshape(count, len(paths), len(THICKNESS_LEVELS))
+
+    program = []
+    column = 0
+    for section_index, module, fields, roasted in steps:
+        program.append((section_index, module, {field: values[:, column + i] for i, field in enumerate(fields)},
+                        roast_extra if roasted else None))
+        column += len(fields)
+
+    positions = {}
+    # The first pass leaves every module where a finished roti leaves it,
+    # so the second pass times the steady state rather than a cold start
+    for _ in range(2):
+        seconds = np.zeros((count, len(STEP_SECTIONS), len(THICKNESS_LEVELS)))
+        for section_index, module, fields, extra in program:
+            time = np.zeros((count, len(THICKNESS_LEVELS)))
+            if 'vtPosition' in fields and 'vtSpeed' in fields:
+                time += _travel(positions, module, fields['vtPosition'], fields['vtSpeed'])
+            if 'position' in fields and 'speed' in fields:
+                time += _travel(positions, module, fields['position'], fields['speed'])
+            for field in ('knDuration', 'duration', 'holdTime'):
+                if field in fields:
+                    time += fields[field] / MS_PER_SECOND
+            if 'upPosition' in fields and 'upSpeed' in fields:
+                time += _travel(positions, module, fields['upPosition'], fields['upSpeed'])
+            if extra is not None:
+                time += extra
+            seconds[:, section_index] += time
+    return seconds
+
+def simulate_batch(recipes, roast_level=DEFAULT_ROAST_LEVEL):
+    """Simulate many recipes; return a dict of arrays indexed (recipe, thickness)
+
+    stage_seconds is indexed (recipe, section, thickness) in STEP_SECTIONS
+    order, and bottleneck_stage holds indexes into STEP_SECTIONS.
+    """
+    if not 1 <= roast_level <= ROAST_LEVELS:
+        raise ValueError(f"Roast level must be 1-{ROAST_LEVELS}, got {roast_level}")
+    recipes = list(recipes)
+    shape = (len(recipes), len(THICKNESS_LEVELS))
+    stage_seconds = np.zeros((len(recipes), len(STEP_SECTIONS), len(THICKNESS_LEVELS)))
+    seconds_per_roti = np.zeros(shape)
+    bottleneck_stage = np.zeros(shape, dtype=int)
+
+    layouts = {}
+    for index, data in enumerate(recipes):
+        layouts.setdefault(step_layout(data), []).append(index)
+    for rows in layouts.values():
+        seconds = _simulate_layout([recipes[i] for i in rows], roast_level)
+        stations = find_stations(recipes[rows[0]])
+        # (stations, recipes, thickness) total time of each station
+        station_seconds = np.stack([seconds[:, sections].sum(axis=1) for name, sections in stations])
+        slowest = station_seconds.argmax(axis=0)
+        for station_index, (name, sections) in enumerate(stations):
+            longest = np.asarray(sections)[seconds[:, sections].argmax(axis=1)]
+            bottleneck_stage[rows] = np.where(slowest == station_index, longest, bottleneck_stage[rows])
+        stage_seconds[rows] = seconds
+        seconds_per_roti[rows] = station_seconds.max(axis=0)
+
+    with np.errstate(divide='ignore'):
+        rotis_per_hour = np.where(seconds_per_roti > 0, 3600.0 / seconds_per_roti, 0.0)
+    return {
+        'stage_seconds': stage_seconds,
+        'latency_seconds': stage_seconds.sum(axis=1),
+        'seconds_per_roti': seconds_per_roti,
+        'rotis_per_hour': rotis_per_hour,
+        'bottleneck_stage': bottleneck_stage,
+    }
+
+def simulate(data, roast_level=DEFAULT_ROAST_LEVEL):
+    """Simulate one recipe; return its timeline and throughput per thickness as plain data"""
+    batch = simulate_batch([data], roast_level)
+    stations = find_stations(data)
+    seconds = batch['stage_seconds'][0]
+    return {
+        'recipeName': data.get('recipeName', ''),
+        'roastLevel': roast_level,
+        'thickness': list(THICKNESS_LEVELS),
+        'stages': {section: seconds[i].tolist() for i, section in enumerate(STEP_SECTIONS)},
+        'stations': {
+            name: {'stages': [STEP_SECTIONS[i] for i in sections], 'seconds': seconds[sections].sum(axis=0).tolist()}
+            for name, sections in stations
+        },
+        'secondsPerRoti': batch['seconds_per_roti'][0].tolist(),
+        'rotisPerHour': batch['rotis_per_hour'][0].tolist(),
+        'latencySeconds': batch['latency_seconds'][0].tolist(),
+        'bottleneck': [STEP_SECTIONS[i] for i in batch['bottleneck_stage'][0]],
+    }
+
+def format_report(result):
+    """Return a text table of one simulation result"""
+    levels = result['thickness']
+    lines = [f"{result['recipeName']} (roast level {result['roastLevel']})",
+             f"{'stage':<24}" + ''.join(f'{level:>9}' for level in levels)]
+    for name, station in result['stations'].items():
+        for stage in station['stages']:
+            lines.append(f"  {stage:<22}" + ''.join(f'{s:>9.1f}' for s in result['stages'][stage]))
+        lines.append(f"{'station ' + name:<24}" + ''.join(f'{s:>9.1f}' for s in station['seconds']))
+    lines.append(f"{'seconds per roti':<24}" + ''.join(f'{s:>9.1f}' for s in result['secondsPerRoti']))
+    lines.append(f"{'rotis per hour':<24}" + ''.join(f'{r:>9.1f}' for r in result['rotisPerHour']))
+    lines.append(f"{'first roti (s)':<24}" + ''.join(f'{s:>9.1f}' for s in result['latencySeconds']))
+    lines.append(f"{'bottleneck':<24}" + ', '.join(f'{level} {stage}'
+                                                     for level, stage in zip(levels, result['bottleneck'])))
+    return '\n'.join(lines)
+
+def load_recipes(paths):
+    """Load and validate every recipe file given or found in given directories; report and skip invalid ones"""
+    recipes = []
+    sources = []
+    for path in map(Path, paths):
+        for json_path in sorted(path.glob('*.json')) if path.is_dir() else [path]:
+            try:
+                recipes.append(load_recipe(json_path))
+            except RecipeValidationError as e:
+                print(f"Invalid: {json_path}")
+                for error in e.errors:
+                    print(f"    {error}")
+                continue
+            except (OSError, ValueError) as e:
+                print(f"Invalid: {json_path}")
+                print(f"    <recipe>: could not load JSON: {e}")
+                continue
+            sources.append(str(json_path))
+    return recipes, sources
+
+def main():
+    parser = argparse.ArgumentParser(description='Estimate cycle time and throughput from recipe step data')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    show_cmd = commands.add_parser('show', help='print the stage timeline of each recipe')
+    show_cmd.add_argument('recipes', nargs='+', help='recipe JSON files')
+    show_cmd.add_argument('--json', action='store_true', help='print results as JSON')
+
+    rank_cmd = commands.add_parser('rank', help='rank recipes by rotis per hour')
+    rank_cmd.add_argument('paths', nargs='*', default=[str(RECIPES_DIR)], help='recipe files or directories')
+    rank_cmd.add_argument('--thickness', default='medium', choices=list(THICKNESS_LEVELS))
+    rank_cmd.add_argument('--top', type=int, default=None, help='only show the best N')
+
+    for command in (show_cmd, rank_cmd):
+        command.add_argument('--roast-level', type=int, default=DEFAULT_ROAST_LEVEL,
+                             help=f'roast level 1-{ROAST_LEVELS} (default: {DEFAULT_ROAST_LEVEL})')
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        results = [simulate(load_recipe(path), args.roast_level) for path in args.recipes]
+        if args.json:
+            print(json.dumps(results, indent=4))
+        else:
+            print('\n\n'.join(format_report(result) for result in results))
+        return
+
+    recipes, sources = load_recipes(args.paths)
+    batch = simulate_batch(recipes, args.roast_level)
+    level = THICKNESS_LEVELS[args.thickness]
+    order = np.argsort(-batch['rotis_per_hour'][:, level], kind='stable')[:args.top]
+    print(f"{'rank':>4} {'rotis/h':>8} {'s/roti':>7} {'bottleneck':<24} recipe")
+    for rank, row in enumerate(order, 1):
+        print(f"{rank:>4} {batch['rotis_per_hour'][row, level]:>8.1f} {batch['seconds_per_roti'][row, level]:>7.1f} "
+              f"{STEP_SECTIONS[batch['bottleneck_stage'][row, level]]:<24} {sources[row]}")
+
+if __name__ == '__main__':
+    main()
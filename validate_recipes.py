@@ -0,0 +1,460 @@
+"""Schema validation for recipe JSON
+
+RECIPE_SCHEMA describes the recipe layout: per-thickness array lengths,
+numeric ranges, and the step keys and fields each process section needs.
+compile_schema() turns it once into specialised Python functions, one per
+object in the schema, with every check inlined, so validating a recipe is a
+straight run of type and comparison tests with no schema interpretation per
+document.
+
+    python validate_recipes.py                  # every Recipes/*.json
+    python validate_recipes.py a.json b.json --jobs 8 --json
+"""
+import argparse
+import itertools
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Values per thickness level in every per-thickness array
+THICKNESS_COUNT = 3
+
+# Values per roast level in settings.roastLevel arrays
+ROAST_LEVEL_COUNT = 5
+
+class RecipeValidationError(ValueError):
+    """Raised when a recipe does not match RECIPE_SCHEMA"""
+
+    def __init__(self, source, errors):
+        self.source = source
+        self.errors = errors
+        super().__init__(f"{source}: {len(errors)} validation error(s): " + '; '.join(errors[:5]))
+
+def number(minimum=None, maximum=None):
+    return {'type': 'number', 'minimum': minimum, 'maximum': maximum}
+
+def integer(minimum=None, maximum=None):
+    return {'type': 'integer', 'minimum': minimum, 'maximum': maximum}
+
+def string(min_length=0):
+    return {'type': 'string', 'minLength': min_length}
+
+def array(length, minimum=None, maximum=None):
+    return {'type': 'array', 'length': length, 'minimum': minimum, 'maximum': maximum}
+
+def per_thickness(minimum=None, maximum=None):
+    return array(THICKNESS_COUNT, minimum, maximum)
+
+def obj(properties=None, required=None, additional=True, values=None, key_pattern=None, step_keys=False,
+        checks=()):
+    """Object schema; required names a subset of properties and defaults to all of them
+
+    values validates every entry not named in properties, key_pattern
+    restricts key names, and step_keys requires contiguous step0..stepN keys.
+    checks are functions of the object returning an error message or None,
+    for rules spanning several fields; they must tolerate malformed input.
+    """
+    properties = properties or {}
+    return {
+        'type': 'object',
+        'properties': properties,
+        'required': list(properties) if required is None else required,
+        'additional': additional,
+        'values': values,
+        'keyPattern': key_pattern,
+        'stepKeys': step_keys,
+        'checks': list(checks),
+    }
+
+# Every field a process step may carry
+STEP_FIELD_SCHEMAS = {
+    'module': string(1),
+    'command': string(1),
+    'vtPosition': per_thickness(0),
+    'vtSpeed': per_thickness(0),
+    'knSpeed': per_thickness(0),
+    'knDuration': per_thickness(0),
+    'position': per_thickness(0),
+    'speed': per_thickness(0),
+    'duration': per_thickness(0),
+    'current': per_thickness(0),
+    'tolerance': per_thickness(0),
+    'holdTime': per_thickness(0),
+    'upPosition': per_thickness(0),
+    'upSpeed': per_thickness(0),
+}
+
+KNEADER_STEP_FIELDS = ['vtPosition', 'vtSpeed', 'knSpeed', 'knDuration']
+MOTION_STEP_FIELDS = ['module', 'command', 'position', 'speed']
+COMMAND_STEP_FIELDS = ['module', 'command']
+
+# Process section -> fields every step in it must have
+SECTION_REQUIRED_FIELDS = {
+    'mixing': KNEADER_STEP_FIELDS,
+    'doughing': KNEADER_STEP_FIELDS,
+    'stabilizing': KNEADER_STEP_FIELDS,
+    'rounding': KNEADER_STEP_FIELDS,
+    'tractionlosscorrection': KNEADER_STEP_FIELDS,
+    'transferring': MOTION_STEP_FIELDS,
+    'pressing': COMMAND_STEP_FIELDS,
+    'roasting': COMMAND_STEP_FIELDS,
+    'kicking': MOTION_STEP_FIELDS,
+}
+
+def steps(required_fields):
+    """Schema for a process section: step0..stepN (at least one), each with the given required fields"""
+    step = obj(STEP_FIELD_SCHEMAS, required=required_fields, additional=False)
+    return obj({'step0': step}, values=step, key_pattern=r'step\d+$', step_keys=True)
+
+def roast_step_exists(settings):
+    """Error unless roastLevel.step names a roasting step, in recipes that roast
+
+    A recipe roasts if its roasting section has a timer step for the roast
+    level's duration to extend; the poori recipes only home the plate.
+    """
+    roast_level = settings.get('roastLevel')
+    thickness = settings.get('thickness')
+    if not isinstance(roast_level, dict) or not isinstance(thickness, dict):
+        return None
+    roasting = thickness.get('roasting')
+    step = roast_level.get('step')
+    if not isinstance(roasting, dict) or type(step) is not int:
+        return None
+    roasts = any(isinstance(s, dict) and s.get('module') == 'timer' for s in roasting.values())
+    if roasts and f'step{step}' not in roasting:
+        return f'roastLevel.step {step} is not a roasting step (step0..step{len(roasting) - 1})'
+    return None
+
+TEMPERATURE = per_thickness(0, 300)
+HEATING_TOLERANCE = per_thickness(0, 50)
+
+RECIPE_SCHEMA = obj({
+    'recipeId': integer(0),
+    'recipeName': string(1),
+    'recipeVersion': string(1),
+    'description': string(),
+    'qualityControl': obj({
+        'quality': obj(values=obj({
+            'softness': number(-1, 1),
+            'roastStep': integer(0, 50),
+            'roastMaxStep': integer(0, 50),
+            'note': string(),
+        }), key_pattern=r'option\d+$'),
+        'size': obj({
+            'option1': number(-1, 1),
+            'option2': number(-1, 1),
+            'upLimit': number(-1, 1),
+            'downLimit': number(-1, 1),
+        }),
+        'softness': obj({
+            'option1': number(-1, 1),
+            'option2': number(-1, 1),
+            'option3': number(-1, 1),
+            'option4': number(-1, 1),
+            'option5': number(-1, 1),
+            'upLimit': number(-1, 1),
+            'downLimit': number(-1, 1),
+        }),
+    }),
+    'settings': obj({
+        'roastLevel': obj({
+            'step': integer(0, 50),
+            'duration': array(ROAST_LEVEL_COUNT, 0, 60000),
+            'topRoastTemp': array(ROAST_LEVEL_COUNT, 0, 300),
+            'btmRoastTemp': array(ROAST_LEVEL_COUNT, 0, 300),
+        }),
+        'oilLevel': per_thickness(0, 1),
+        'thickness': obj({
+            'heating': obj({
+                'temperature': obj({
+                    'top': TEMPERATURE,
+                    'bottom': TEMPERATURE,
+                    'topRoast': TEMPERATURE,
+                    'bottomRoast': TEMPERATURE,
+                }),
+                'tolerance': obj({
+                    'top': HEATING_TOLERANCE,
+                    'bottom': HEATING_TOLERANCE,
+                    'topRoast': HEATING_TOLERANCE,
+                    'bottomRoast': HEATING_TOLERANCE,
+                }),
+                'warmTolerance': obj({
+                    'top': HEATING_TOLERANCE,
+                    'bottom': HEATING_TOLERANCE,
+                    'topRoast': HEATING_TOLERANCE,
+                    'bottomRoast': HEATING_TOLERANCE,
+                }),
+            }),
+            'dispensing': obj({
+                'weight': obj({
+                    'db': per_thickness(0, 200),
+                    'oil': per_thickness(0, 20),
+                    'ratioWaterFlour': obj(values=per_thickness(0.2, 1.5), required=[]),
+                }),
+                'tolerance': obj({
+                    'flour': per_thickness(0, 10),
+                    'water': per_thickness(0, 10),
+                    'oil': per_thickness(0, 5),
+                    'ratioWaterFlour': per_thickness(0, 0.5),
+                }),
+            }),
+            'adaptiveDAK': obj({
+                'hardness': per_thickness(0, 5000),
+                'tolerance': per_thickness(0, 5000),
+                'slurryRange': per_thickness(0, 5000),
+            }),
+            'dropping': obj(required=[]),
+            **{name: steps(fields) for name, fields in SECTION_REQUIRED_FIELDS.items()},
+        }, required=['heating', 'dispensing', 'adaptiveDAK', *SECTION_REQUIRED_FIELDS]),
+    }, checks=[roast_step_exists]),
+}, required=['recipeId', 'recipeName', 'recipeVersion', 'qualityControl', 'settings'])
+
+def _step_keys_contiguous(steps):
+    """True if the keys of a steps object are exactly step0..stepN"""
+    return sorted(int(k[4:]) for k in steps if k[4:].isdigit()) == list(range(len(steps)))
+
+class _Emitter:
+    """Accumulates the source of a compiled validator"""
+
+    def __init__(self):
+        self.lines = []
+        self.helpers = []
+        self.names = itertools.count()
+        self.constants = {}
+
+    def var(self, prefix='v'):
+        return f'{prefix}{next(self.names)}'
+
+    def constant(self, value):
+        name = f'_c{len(self.constants)}'
+        self.constants[name] = value
+        return name
+
+    def line(self, indent, text):
+        self.lines.append('    ' * indent + text)
+
+def _path_expr(path):
+    """Python expression for a path made of literal keys and ('var', name) parts"""
+    text = '.'.join(
+        part.replace('{', '{{').replace('}', '}}') if isinstance(part, str) else '{' + part[1] + '}'
+        for part in path
+    )
+    if all(isinstance(part, str) for part in path):
+        return repr('.'.join(path) or '<recipe>')
+    return 'f' + repr(text)
+
+def _in_range_expr(value, minimum, maximum):
+    """Comparison that is False for NaN as well as for values out of range"""
+    if minimum is not None and maximum is not None:
+        return f'{minimum!r} <= {value} <= {maximum!r}'
+    if minimum is not None:
+        return f'{value} >= {minimum!r}'
+    return f'{value} <= {maximum!r}'
+
+def _range_error(path, value, minimum, maximum):
+    """Error message for a number that failed its range check"""
+    if minimum is not None and value < minimum:
+        return f'{path}: value {value!r} is below {minimum!r}'
+    if maximum is not None and value > maximum:
+        return f'{path}: value {value!r} is above {maximum!r}'
+    return f'{path}: value {value!r} is not a number'
+
+def _emit_range(em, indent, value, schema, path):
+    minimum, maximum = schema.get('minimum'), schema.get('maximum')
+    em.line(indent, f'if not ({_in_range_expr(value, minimum, maximum)}):')
+    em.line(indent + 1, f'errors.append(_range_error({_path_expr(path)}, {value}, {minimum!r}, {maximum!r}))')
+
+def _emit_helper(em, schema, value, path, indent):
+    """Emit the checks for a repeated object as a helper function and call it
+
+    Keeping every code object small matters under tracemalloc, which looks up
+    the line of each traced allocation by scanning the code object.
+    """
+    args = ', '.join([value, *(part[1] for part in path if not isinstance(part, str)), 'errors'])
+    name = em.var('_check')
+    em.line(indent, f'{name}({args})')
+    outer, em.lines = em.lines, []
+    em.line(0, f'def {name}({args}):')
+    _emit(em, schema, value, path, 1)
+    em.helpers.append(em.lines)
+    em.lines = outer
+
+def _emit(em, schema, value, path, indent):
+    """Emit the checks for one schema node applied to the variable named value"""
+    kind = schema['type']
+    error = lambda message: f'errors.append({_path_expr(path)} + {message!r})'
+
+    if kind == 'number':
+        em.line(indent, f'if type({value}) not in _NUMBER:')
+        em.line(indent + 1, error(': expected a number'))
+        if schema.get('minimum') is not None or schema.get('maximum') is not None:
+            em.line(indent, 'else:')
+            _emit_range(em, indent + 1, value, schema, path)
+    elif kind == 'integer':
+        em.line(indent, f'if type({value}) is not int:')
+        em.line(indent + 1, error(': expected an integer'))
+        if schema.get('minimum') is not None or schema.get('maximum') is not None:
+            em.line(indent, 'else:')
+            _emit_range(em, indent + 1, value, schema, path)
+    elif kind == 'string':
+        em.line(indent, f'if type({value}) is not str:')
+        em.line(indent + 1, error(': expected a string'))
+        if schema.get('minLength'):
+            em.line(indent, f'elif len({value}) < {schema["minLength"]}:')
+            em.line(indent + 1, error(': must not be empty'))
+    elif kind == 'array':
+        length = schema['length']
+        # Lengths are fixed, so the element type checks are unrolled
+        all_numbers = ' and '.join(f'type({value}[{i}]) in _NUMBER' for i in range(length))
+        em.line(indent, f'if type({value}) is not list:')
+        em.line(indent + 1, error(f': expected a list of {length} numbers'))
+        em.line(indent, f'elif len({value}) != {length}:')
+        em.line(indent + 1, f'errors.append({_path_expr(path)} + ": expected {length} values, got " + str(len({value})))')
+        em.line(indent, f'elif not ({all_numbers}):')
+        em.line(indent + 1, error(': expected only numbers'))
+        minimum, maximum = schema.get('minimum'), schema.get('maximum')
+        if minimum is not None or maximum is not None:
+            # Unrolled rather than min()/max(), which skip NaN depending on its position
+            in_range = ' and '.join(_in_range_expr(f'{value}[{i}]', minimum, maximum) for i in range(length))
+            offender = f'next(_x for _x in {value} if not ({_in_range_expr("_x", minimum, maximum)}))'
+            em.line(indent, f'elif not ({in_range}):')
+            em.line(indent + 1, f'errors.append(_range_error({_path_expr(path)}, {offender}, {minimum!r}, {maximum!r}))')
+    elif kind == 'object':
+        properties = schema['properties']
+        em.line(indent, f'if type({value}) is not dict:')
+        em.line(indent + 1, error(': expected an object'))
+        em.line(indent, 'else:')
+        indent += 1
+        start = len(em.lines)
+        required = set(schema['required'])
+        for key, sub in properties.items():
+            child = em.var()
+            em.line(indent, f'{child} = {value}.get({key!r}, _MISSING)')
+            if key in required:
+                em.line(indent, f'if {child} is _MISSING:')
+                em.line(indent + 1, f'errors.append({_path_expr(path + [key])} + ": is required")')
+                em.line(indent, 'else:')
+            else:
+                em.line(indent, f'if {child} is not _MISSING:')
+            if sub['type'] == 'object':
+                _emit_helper(em, sub, child, path + [key], indent + 1)
+            else:
+                _emit(em, sub, child, path + [key], indent + 1)
+        if schema['stepKeys']:
+            em.line(indent, f'if not _step_keys_contiguous({value}):')
+            em.line(indent + 1, error(': step keys must run step0..stepN without gaps'))
+        for check in schema['checks']:
+            message = em.var('m')
+            em.line(indent, f'{message} = {em.constant(check)}({value})')
+            em.line(indent, f'if {message} is not None:')
+            em.line(indent + 1, f'errors.append({_path_expr(path)} + ": " + {message})')
+        if schema['values'] is not None or schema['keyPattern'] or schema['additional'] is False:
+            key_var, child = em.var('k'), em.var()
+            known = em.constant(frozenset(properties))
+            em.line(indent, f'for {key_var}, {child} in {value}.items():')
+            em.line(indent + 1, f'if {key_var} in {known}:')
+            em.line(indent + 2, 'continue')
+            child_path = path + [('var', key_var)]
+            if schema['keyPattern']:
+                pattern = em.constant(re.compile(schema['keyPattern']))
+                em.line(indent + 1, f'if type({key_var}) is not str or not {pattern}.match({key_var}):')
+                em.line(indent + 2, f'errors.append({_path_expr(child_path)} + ": unexpected key")')
+                em.line(indent + 2, 'continue')
+            if schema['additional'] is False:
+                em.line(indent + 1, f'errors.append({_path_expr(child_path)} + ": unknown field")')
+            elif schema['values'] is not None and schema['values']['type'] == 'object':
+                _emit_helper(em, schema['values'], child, child_path, indent + 1)
+            elif schema['values'] is not None:
+                _emit(em, schema['values'], child, child_path, indent + 1)
+            else:
+                em.line(indent + 1, 'pass')
+        if len(em.lines) == start:
+            em.line(indent, 'pass')
+    else:
+        raise ValueError(f"Unknown schema type '{kind}'")
+
+def compile_schema(schema, name='validate_recipe'):
+    """Compile a schema into a function returning a list of error strings"""
+    em = _Emitter()
+    em.line(0, f'def {name}(data):')
+    em.line(1, 'errors = []')
+    _emit(em, schema, 'data', [], 1)
+    em.line(1, 'return errors')
+    source = '\n\n'.join('\n'.join(lines) for lines in [*em.helpers, em.lines]) + '\n'
+
+    namespace = {'_NUMBER': (int, float), '_MISSING': object(), '_step_keys_contiguous': _step_keys_contiguous,
+                 '_range_error': _range_error,
+                 **em.constants}
+    exec(compile(source, f'<compiled {name}>', 'exec'), namespace)
+    validator = namespace[name]
+    validator.source = source
+    return validator
+
+_recipe_validator = None
+
+def recipe_validator():
+    """Return the compiled RECIPE_SCHEMA validator, compiling it on first use
+
+    Compiling takes tens of milliseconds, so importers that never validate
+    (e.g. a no-op incremental build) do not pay for it.
+    """
+    global _recipe_validator
+    if _recipe_validator is None:
+        _recipe_validator = compile_schema(RECIPE_SCHEMA)
+    return _recipe_validator
+
+def validate_recipe(data):
+    """Return a list of error strings for data; empty if it matches RECIPE_SCHEMA"""
+    return recipe_validator()(data)
+
+def check_recipe(data, source='<recipe>'):
+    """Raise RecipeValidationError if data does not match RECIPE_SCHEMA"""
+    errors = recipe_validator()(data)
+    if errors:
+        raise RecipeValidationError(source, errors)
+
+def validate_file(json_path):
+    """Return (path, errors) for one recipe file; unreadable JSON is an error too"""
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        return str(json_path), [f'<recipe>: could not load JSON: {e}']
+    return str(json_path), validate_recipe(data)
+
+def validate_all(json_paths, jobs=None):
+    """Validate many recipe files in parallel; return {path: errors}"""
+    json_paths = list(json_paths)
+    if len(json_paths) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(json_paths) // ((jobs or 4) * 4))
+            return dict(pool.map(validate_file, json_paths, chunksize=chunksize))
+    return dict(validate_file(path) for path in json_paths)
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate recipe JSON files against the recipe schema')
+    parser.add_argument('json_files', nargs='*', help='recipes to check (default: Recipes/*.json)')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--json', action='store_true', help='print a machine-readable report')
+    parser.add_argument('--show-source', action='store_true', help='print the compiled validator and exit')
+    args = parser.parse_args()
+
+    if args.show_source:
+        print(recipe_validator().source)
+        return
+
+    json_paths = args.json_files or sorted(Path('Recipes').glob('*.json'))
+    report = validate_all(json_paths, args.jobs)
+    if args.json:
+        print(json.dumps(report, indent=4))
+    else:
+        for path, errors in report.items():
+            print(f"{'OK  ' if not errors else 'FAIL'} {path}")
+            for error in errors:
+                print(f"    {error}")
+    sys.exit(1 if any(report.values()) else 0)
+
+if __name__ == '__main__':
+    main()